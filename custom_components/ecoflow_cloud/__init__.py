@@ -1,11 +1,13 @@
+import asyncio
 import logging
 from typing import Final
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt
 
-from . import _preload_proto  # noqa: F401 # pyright: ignore[reportUnusedImport]
 from .device_data import DeviceData, DeviceOptions
 
 _LOGGER = logging.getLogger(__name__)
@@ -29,6 +31,8 @@ ATTR_MQTT_CONNECTED = "mqtt_connected"
 ATTR_STATUS_RECONNECTS = "reconnects"
 ATTR_STATUS_PHASE = "status_phase"
 ATTR_QUOTA_REQUESTS = "quota_requests"
+ATTR_API_CIRCUIT = "api_circuit"
+ATTR_STATUS_DATA_STALE = "data_stale"
 
 CONF_AUTH_TYPE: Final = "auth_type"
 
@@ -53,6 +57,8 @@ OPTS_POWER_STEP: Final = "power_step"
 OPTS_REFRESH_PERIOD_SEC: Final = "refresh_period_sec"
 
 DEFAULT_REFRESH_PERIOD_SEC: Final = 5
+# devices with a snapshot younger than this skip the quota request on setup
+SNAPSHOT_MAX_AGE_SKIP_QUOTA_SEC: Final = 600
 
 
 async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry):
@@ -173,6 +179,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
             entry.data[CONF_USERNAME],
             entry.data[CONF_PASSWORD],
             entry.data[CONF_GROUP],
+            async_get_clientsession(hass),
         )
 
     elif CONF_ACCESS_KEY in entry.data and CONF_SECRET_KEY in entry.data:
@@ -183,35 +190,137 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
             entry.data[CONF_ACCESS_KEY],
             entry.data[CONF_SECRET_KEY],
             entry.data[CONF_GROUP],
+            async_get_clientsession(hass),
+        )
+        # status messages are applied on the ingest workers, the device list
+        # cache is read and written on the event loop
+        api_client.router.status_listener = lambda: hass.loop.call_soon_threadsafe(
+            api_client.invalidate_device_list
         )
     else:
         return False
 
     devices_list: dict[str, DeviceData] = extract_devices(entry)
 
-    await api_client.login()
+    from .storage import EcoflowCredentialsStore
+
+    credentials_store = EcoflowCredentialsStore(hass, entry.entry_id)
+    stored_credentials = await credentials_store.async_load()
+    if stored_credentials is not None and api_client.restore_credentials(
+        stored_credentials
+    ):
+        # connect with the last credentials, the login runs in the background
+        _LOGGER.info("Using stored MQTT credentials for %s", entry.title)
+        refresh_credentials = True
+    else:
+        await api_client.login()
+        await credentials_store.async_save(api_client.export_credentials())
+        refresh_credentials = False
+
+    from .storage import EcoflowSnapshotStore
+
+    snapshot_store = EcoflowSnapshotStore(hass, entry.entry_id)
+    snapshot = await snapshot_store.async_load()
+    now = dt.utcnow().timestamp()
+    restored_devices = set[str]()
 
+    await hass.async_add_executor_job(
+        api_client.preload_device_classes, devices_list.values()
+    )
     for sn, device_data in devices_list.items():
         device = api_client.configure_device(device_data)
-        device.configure(hass)
+        device_snapshot = snapshot.get(sn) or {}
+        device.configure(hass, device_snapshot.get("params"))
+        if now - device_snapshot.get("time", 0) < SNAPSHOT_MAX_AGE_SKIP_QUOTA_SEC:
+            restored_devices.add(sn)
+        entry.async_on_unload(
+            device.coordinator.async_add_listener(
+                _snapshot_save_listener(snapshot_store, api_client, device.coordinator)
+            )
+        )
+    entry.async_on_unload(lambda: snapshot_store.async_save(api_client.devices))
 
     await hass.async_add_executor_job(api_client.start)
     hass.data[ECOFLOW_DOMAIN][entry.entry_id] = api_client
+
+    def refresh_credentials_in_background():
+        entry.async_create_background_task(
+            hass,
+            _async_refresh_credentials(hass, entry, api_client, credentials_store),
+            "ecoflow credentials refresh",
+        )
+
+    api_client.auth_failure_listener = lambda: hass.loop.call_soon_threadsafe(
+        refresh_credentials_in_background
+    )
+    if refresh_credentials:
+        refresh_credentials_in_background()
+
     await hass.config_entries.async_forward_entry_setups(entry, _PLATFORMS)
 
-    await api_client.quota_all(None)
+    if not restored_devices:
+        await api_client.quota_all(None)
+    else:
+        # recently restored devices wait for their next message, the others are
+        # requested concurrently (the public API keeps at most
+        # DEFAULT_QUOTA_CONCURRENCY /device/quota/all calls in flight)
+        await asyncio.gather(
+            *(
+                api_client.quota_all(sn)
+                for sn in devices_list
+                if sn not in restored_devices
+            )
+        )
 
     entry.async_on_unload(entry.add_update_listener(update_listener))
 
     return True
 
 
+def _snapshot_save_listener(snapshot_store, api_client, coordinator):
+    @callback
+    def schedule_save():
+        # the watchdog ticks broadcast as well, only save when params changed
+        broadcast = coordinator.data
+        if broadcast is not None and (broadcast.changed or broadcast.changed_keys):
+            snapshot_store.async_schedule_save(api_client.devices)
+
+    return schedule_save
+
+
+async def _async_refresh_credentials(
+    hass: HomeAssistant, entry: ConfigEntry, api_client, credentials_store
+):
+    try:
+        changed = await api_client.refresh_credentials()
+    except Exception as error:
+        _LOGGER.warning("Failed to refresh EcoFlow credentials: %s", error)
+        return
+
+    await credentials_store.async_save(api_client.export_credentials())
+    if changed:
+        # the device topics and the running client use the old credentials,
+        # set everything up again from the saved ones
+        _LOGGER.info("MQTT credentials changed, reloading %s", entry.title)
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    from .storage import EcoflowCredentialsStore, EcoflowSnapshotStore
+
+    await EcoflowCredentialsStore(hass, entry.entry_id).async_remove()
+    await EcoflowSnapshotStore(hass, entry.entry_id).async_remove()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     if not await hass.config_entries.async_unload_platforms(entry, _PLATFORMS):
         return False
 
     client = hass.data[ECOFLOW_DOMAIN].pop(entry.entry_id)
-    client.stop()
+    client.auth_failure_listener = None
+    # joins the MQTT, reconnect and ingest threads, keep that off the event loop
+    await hass.async_add_executor_job(client.stop)
+    await client.http.close()
     return True
 
 
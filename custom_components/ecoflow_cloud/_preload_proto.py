@@ -1,5 +0,0 @@
-from .devices.internal.proto import (
-    ecopacket_pb2,  # noqa: F401 # pyright: ignore[reportUnusedImport]
-    platform_pb2,  # noqa: F401 # pyright: ignore[reportUnusedImport]
-    powerstream_pb2,  # noqa: F401 # pyright: ignore[reportUnusedImport]
-)
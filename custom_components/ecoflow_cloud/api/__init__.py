@@ -1,20 +1,63 @@
+import asyncio
 import logging
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import Awaitable, Callable, Iterable
+from typing import TYPE_CHECKING, Any
 
-from aiohttp import ClientResponse
+from aiohttp import ClientConnectionError, ClientResponse, ClientSession
 from attr import dataclass
 
 from ..device_data import DeviceData
+from .http import EcoflowHttpSession
+from .ingest import (
+    DEFAULT_INGEST_COALESCE,
+    DEFAULT_INGEST_QUEUE_SIZE,
+    DEFAULT_INGEST_WORKERS,
+    EcoflowIngestPipeline,
+)
 from .message import JSONMessage, Message
+from .reconnect import EcoflowReconnectSupervisor
+from .resilience import (
+    DEFAULT_RETRY_ATTEMPTS,
+    BreakerState,
+    CircuitBreaker,
+    retry_delay,
+)
+from .single_flight import EcoflowSingleFlight
+from .topic_router import EcoflowTopicRouter
+
+if TYPE_CHECKING:
+    from ..devices.registry import LazyDeviceRegistry
 
 _LOGGER = logging.getLogger(__name__)
 
+# minimal time between two real quota requests for the same device
+DEFAULT_QUOTA_MIN_INTERVAL_SEC = 10
+# minimal time between two logins refreshing the MQTT credentials
+DEFAULT_LOGIN_MIN_INTERVAL_SEC = 60
+
 
 class EcoflowException(Exception):
     pass
 
 
+class EcoflowHttpError(EcoflowException):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class EcoflowCircuitOpenError(EcoflowException):
+    pass
+
+
+def _is_retryable(error: Exception) -> bool:
+    # transport problems and server side errors, not rejected requests
+    if isinstance(error, EcoflowHttpError):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, (ClientConnectionError, asyncio.TimeoutError))
+
+
 @dataclass
 class EcoflowMqttInfo:
     url: str
@@ -25,32 +68,134 @@ class EcoflowMqttInfo:
 
 
 class EcoflowApiClient(ABC):
-    def __init__(self):
+    def __init__(
+        self,
+        session: ClientSession | None = None,
+        ingest_queue_size: int = DEFAULT_INGEST_QUEUE_SIZE,
+        ingest_workers: int = DEFAULT_INGEST_WORKERS,
+        ingest_coalesce: bool = DEFAULT_INGEST_COALESCE,
+    ):
         self.mqtt_info: EcoflowMqttInfo
         self.devices: dict[str, Any] = {}
+        self.http = EcoflowHttpSession(session)
+        self.router = EcoflowTopicRouter()
+        self.ingest = EcoflowIngestPipeline(
+            self.router.route,
+            ingest_queue_size,
+            ingest_workers,
+            self.router.coalesce_key,
+            ingest_coalesce,
+        )
         self.mqtt_client = None
+        self.reconnect_supervisor = EcoflowReconnectSupervisor(self.__reconnect_mqtt)
+        self.quota_flight = EcoflowSingleFlight(DEFAULT_QUOTA_MIN_INTERVAL_SEC)
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.login_flight = EcoflowSingleFlight(DEFAULT_LOGIN_MIN_INTERVAL_SEC)
+        # called from the MQTT thread when the broker rejects the credentials
+        self.auth_failure_listener: Callable[[], None] | None = None
 
     @abstractmethod
     async def login(self):
         pass
 
     @abstractmethod
-    async def fetch_all_available_devices(self):
+    def _credentials_account(self) -> str:
+        # identifies the account stored credentials belong to
         pass
 
+    def export_credentials(self) -> dict[str, Any]:
+        return {
+            "account": self._credentials_account(),
+            "mqtt": {
+                "url": self.mqtt_info.url,
+                "port": self.mqtt_info.port,
+                "username": self.mqtt_info.username,
+                "password": self.mqtt_info.password,
+                "client_id": self.mqtt_info.client_id,
+            },
+        }
+
+    def restore_credentials(self, credentials: dict[str, Any]) -> bool:
+        # False if they are incomplete or belong to another account
+        try:
+            if credentials["account"] != self._credentials_account():
+                return False
+            mqtt = credentials["mqtt"]
+            self.mqtt_info = EcoflowMqttInfo(
+                mqtt["url"],
+                int(mqtt["port"]),
+                mqtt["username"],
+                mqtt["password"],
+                mqtt["client_id"],
+            )
+        except (KeyError, TypeError, ValueError):
+            return False
+        return True
+
+    async def refresh_credentials(self) -> bool:
+        """Log in again, True if the MQTT credentials changed.
+
+        Concurrent refreshes share one login, see login_flight.
+        """
+        return bool(await self.login_flight.run(None, self.__refresh_credentials))
+
+    def _topic_owner(self) -> Any:
+        # besides the MQTT username, whatever the device topics are built from
+        return None
+
+    async def __refresh_credentials(self) -> bool:
+        old = getattr(self, "mqtt_info", None)
+        old_owner = self._topic_owner()
+        await self.login()
+        new = self.mqtt_info
+        if (
+            old is not None
+            and (old.url, old.port, old.username, old.password)
+            == (new.url, new.port, new.username, new.password)
+            and old_owner == self._topic_owner()
+        ):
+            # keep the client id, the broker only accepts a few new ones per day
+            self.mqtt_info = old
+            return False
+        return True
+
     @abstractmethod
+    async def fetch_all_available_devices(self):
+        pass
+
     async def quota_all(self, device_sn: str | None):
+        # overlapping requests for the same device (or all devices) share one call
+        await self.quota_flight.run(device_sn, lambda: self._quota_all(device_sn))
+
+    @abstractmethod
+    async def _quota_all(self, device_sn: str | None):
         pass
 
+    @abstractmethod
+    def _device_registry(self) -> "LazyDeviceRegistry":
+        pass
+
+    def preload_device_classes(self, devices: Iterable[DeviceData]):
+        # imports the device modules configure_device will need, blocking, run it
+        # in the executor rather than importing on the event loop
+        device_types = set[str]()
+        for device_data in devices:
+            device_types.add(device_data.device_type)
+            if device_data.parent is not None:
+                device_types.add(device_data.parent.device_type)
+        self._device_registry().preload(device_types)
+
     @abstractmethod
     def configure_device(self, device_data: DeviceData):
         pass
 
     def add_device(self, device):
         self.devices[device.device_data.sn] = device
+        self.router.add_device(device)
 
     def remove_device(self, device):
         self.devices.pop(device.device_data.sn, None)
+        self.router.remove_device(device)
 
     def _accept_mqqt_certification(self, resp_json: dict):
         _LOGGER.info(f"Received MQTT credentials: {resp_json}")
@@ -67,9 +212,65 @@ class EcoflowApiClient(ABC):
 
         _LOGGER.info(f"Successfully extracted account: {self.mqtt_info.username}")
 
+    async def _call_with_retry(
+        self, host: str, call: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        """Run a REST call with retries and the circuit breaker of its host.
+
+        Retryable errors (see _is_retryable) are retried with jittered
+        exponential backoff and count against the breaker. While the breaker is
+        open the call fails right away with EcoflowCircuitOpenError.
+        """
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker()
+
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise EcoflowCircuitOpenError(
+                    f"{host} is unavailable, next attempt in {breaker.retry_in():.0f} s"
+                )
+            attempt += 1
+            try:
+                result = await call()
+            except Exception as error:
+                if not _is_retryable(error):
+                    # the host answered
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                if attempt >= DEFAULT_RETRY_ATTEMPTS:
+                    raise
+                delay = retry_delay(attempt)
+                _LOGGER.debug(
+                    "Request to %s failed (%s), retry in %.1f s", host, error, delay
+                )
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # cancelled: no result, but a half open trial must not stay taken
+                breaker.release_trial()
+                raise
+            breaker.record_success()
+            return result
+
+    def circuit_state(self) -> str:
+        # the worst breaker state over all hosts
+        states = {breaker.state for breaker in self.breakers.values()}
+        for state in (BreakerState.OPEN, BreakerState.HALF_OPEN):
+            if state in states:
+                return str(state)
+        return str(BreakerState.CLOSED)
+
+    def breaker_stats(self) -> dict[str, Any]:
+        return {host: breaker.stats() for host, breaker in self.breakers.items()}
+
     async def _get_json_response(self, resp: ClientResponse):
         if resp.status != 200:
-            raise EcoflowException(f"Got HTTP status code {resp.status}: {resp.reason}")
+            raise EcoflowHttpError(
+                resp.status, f"Got HTTP status code {resp.status}: {resp.reason}"
+            )
 
         try:
             json_resp = await resp.json()
@@ -108,8 +309,27 @@ class EcoflowApiClient(ABC):
     def start(self):
         from custom_components.ecoflow_cloud.api.ecoflow_mqtt import EcoflowMQTTClient
 
-        self.mqtt_client = EcoflowMQTTClient(self.mqtt_info, self.devices)
+        self.ingest.start()
+        self.mqtt_client = EcoflowMQTTClient(
+            self.mqtt_info, self.router, self.ingest, self.__on_mqtt_auth_failure
+        )
+        self.reconnect_supervisor.start()
+
+    def __on_mqtt_auth_failure(self):
+        if self.auth_failure_listener is not None:
+            self.auth_failure_listener()
 
     def stop(self):
         assert self.mqtt_client is not None
+        self.reconnect_supervisor.stop()
         self.mqtt_client.stop()
+        self.ingest.stop()
+
+    def request_reconnect(self) -> bool:
+        # never reconnects on the caller's thread, see EcoflowReconnectSupervisor
+        return self.reconnect_supervisor.request_reconnect()
+
+    def __reconnect_mqtt(self) -> bool:
+        if self.mqtt_client is None:
+            return False
+        return self.mqtt_client.reconnect()
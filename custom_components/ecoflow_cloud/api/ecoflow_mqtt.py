@@ -1,25 +1,33 @@
 import logging
 import ssl
-import time
 from _socket import SocketType
+from collections.abc import Callable
 from typing import Any
 
 from homeassistant.core import callback
 from paho.mqtt.client import MQTTMessage, PayloadType
 
-from ..devices import BaseDevice
 from . import EcoflowMqttInfo
+from .ingest import EcoflowIngestPipeline
+from .reconnect import DEFAULT_RECONNECT_MAX_DELAY_SEC, DEFAULT_RECONNECT_MIN_DELAY_SEC
+from .topic_router import EcoflowTopicRouter
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class EcoflowMQTTClient:
-    def __init__(self, mqtt_info: EcoflowMqttInfo, devices: dict[str, BaseDevice]):
-        from ..devices import BaseDevice
-
+    def __init__(
+        self,
+        mqtt_info: EcoflowMqttInfo,
+        router: EcoflowTopicRouter,
+        ingest: EcoflowIngestPipeline,
+        on_auth_failure: Callable[[], None] | None = None,
+    ):
         self.connected = False
         self.__mqtt_info = mqtt_info
-        self.__devices: dict[str, BaseDevice] = devices
+        self.__router = router
+        self.__ingest = ingest
+        self.__on_auth_failure = on_auth_failure
 
         from homeassistant.components.mqtt.async_client import AsyncMQTTClient
 
@@ -31,6 +39,10 @@ class EcoflowMQTTClient:
 
         # self.__client._connect_timeout = 15.0
         self.__client.setup()
+        # automatic reconnects of the paho loop back off on their own thread
+        self.__client.reconnect_delay_set(
+            DEFAULT_RECONNECT_MIN_DELAY_SEC, DEFAULT_RECONNECT_MAX_DELAY_SEC
+        )
         self.__client.username_pw_set(
             self.__mqtt_info.username, self.__mqtt_info.password
         )
@@ -76,6 +88,9 @@ class EcoflowMQTTClient:
             _LOGGER.info(f"Subscribed to MQTT topics {target_topics}")
         else:
             self.__log_with_reason("connect", client, userdata, rc)
+            # 4: bad user name or password, 5: not authorised
+            if rc in (4, 5) and self.__on_auth_failure is not None:
+                self.__on_auth_failure()
 
     @callback
     def _on_disconnect(self, client, userdata, rc):
@@ -87,20 +102,11 @@ class EcoflowMQTTClient:
         self.connected = False
         if rc != 0:
             self.__log_with_reason("disconnect", client, userdata, rc)
-            time.sleep(5)
 
     @callback
     def _on_message(self, client, userdata, message: MQTTMessage):
-        try:
-            for sn, device in self.__devices.items():
-                if device.update_data(message.payload, message.topic):
-                    _LOGGER.debug(
-                        f"Message for {sn} and Topic {message.topic} : {message.payload}"
-                    )
-        except UnicodeDecodeError as error:
-            _LOGGER.error(
-                f"UnicodeDecodeError: {error}. Ignoring message and waiting for the next one."
-            )
+        # decoding happens on the ingest workers, keep the network loop free
+        self.__ingest.submit(message.topic, message.payload)
 
     def stop(self):
         self.__client.unsubscribe(self.__target_topics())
@@ -136,9 +142,5 @@ class EcoflowMQTTClient:
             )
 
     def __target_topics(self) -> list[str]:
-        topics = []
-        for device in self.__devices.values():
-            for topic in device.device_info.topics():
-                topics.append(topic)
-        # Remove duplicates that can occur when multiple devices have the same topic (for example sub devices)
-        return list(set(topics))
+        # router keys are unique, even if multiple devices share a topic (for example sub devices)
+        return self.__router.topics()
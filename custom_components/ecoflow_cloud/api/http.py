@@ -0,0 +1,121 @@
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+DEFAULT_HTTP_CONNECTION_LIMIT = 10
+DEFAULT_HTTP_CONNECTION_LIMIT_PER_HOST = 4
+DEFAULT_HTTP_DNS_CACHE_TTL_SEC = 300
+DEFAULT_HTTP_KEEPALIVE_SEC = 60
+DEFAULT_HTTP_TIMEOUT_SEC = 30
+
+# upper bounds (ms) of the REST latency histogram buckets, the last one is open
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    def __init__(self, buckets_ms: tuple[int, ...] = LATENCY_BUCKETS_MS):
+        self.__buckets_ms = buckets_ms
+        self.__counts = [0] * (len(buckets_ms) + 1)
+        self.__count = 0
+        self.__errors = 0
+        self.__total_ms = 0.0
+        self.__max_ms = 0.0
+
+    def observe(self, seconds: float, failed: bool = False):
+        ms = seconds * 1000
+        index = 0
+        while index < len(self.__buckets_ms) and ms > self.__buckets_ms[index]:
+            index += 1
+        self.__counts[index] += 1
+        self.__count += 1
+        if failed:
+            self.__errors += 1
+        self.__total_ms += ms
+        self.__max_ms = max(self.__max_ms, ms)
+
+    def stats(self) -> dict[str, Any]:
+        labels = [f"<={b}ms" for b in self.__buckets_ms] + [
+            f">{self.__buckets_ms[-1]}ms"
+        ]
+        return {
+            "count": self.__count,
+            "errors": self.__errors,
+            "avg_ms": round(self.__total_ms / self.__count, 1) if self.__count else None,
+            "max_ms": round(self.__max_ms, 1),
+            "buckets": dict(zip(labels, self.__counts)),
+        }
+
+
+class EcoflowHttpSession:
+    """Long-lived pooled HTTP session of an API client.
+
+    Uses the session handed in (Home Assistant's shared one, which is never
+    closed here) or creates its own on first use with keep-alive, connection
+    limits and a DNS cache. Every request is timed per endpoint.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession | None = None):
+        self.__session = session
+        self.__shared = session is not None
+        self.__owned = False
+        self.__latency: dict[str, LatencyHistogram] = {}
+
+    def __get_session(self) -> aiohttp.ClientSession:
+        if self.__session is None or self.__session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=DEFAULT_HTTP_CONNECTION_LIMIT,
+                limit_per_host=DEFAULT_HTTP_CONNECTION_LIMIT_PER_HOST,
+                ttl_dns_cache=DEFAULT_HTTP_DNS_CACHE_TTL_SEC,
+                keepalive_timeout=DEFAULT_HTTP_KEEPALIVE_SEC,
+            )
+            self.__session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=DEFAULT_HTTP_TIMEOUT_SEC),
+            )
+            self.__shared = False
+            self.__owned = True
+        return self.__session
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        handle: Callable[[aiohttp.ClientResponse], Awaitable[_T]],
+        **kwargs,
+    ) -> _T:
+        # the response is handled (read) before its connection goes back to the pool
+        start = time.monotonic()
+        failed = True
+        try:
+            async with self.__get_session().request(method, url, **kwargs) as resp:
+                result = await handle(resp)
+            failed = False
+            return result
+        finally:
+            histogram = self.__latency.get(endpoint)
+            if histogram is None:
+                histogram = self.__latency[endpoint] = LatencyHistogram()
+            histogram.observe(time.monotonic() - start, failed)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "shared_session": self.__shared,
+            "latency": {
+                endpoint: histogram.stats()
+                for endpoint, histogram in sorted(self.__latency.items())
+            },
+        }
+
+    async def close(self):
+        if self.__owned and self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+            self.__owned = False
@@ -0,0 +1,209 @@
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Hashable
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_INGEST_QUEUE_SIZE = 1000
+DEFAULT_INGEST_WORKERS = 1
+DEFAULT_INGEST_COALESCE = True
+
+# coalesce key of a pending entry not computed yet
+_NO_KEY = object()
+
+
+class EcoflowIngestPipeline:
+    """Bounded hand-off between the paho network thread and payload decoding.
+
+    The network thread only calls submit(), which stores (payload, receive time)
+    per topic. Worker threads take the topics in arrival order and run the
+    handler (decode + merge). A topic is never processed by two workers at the
+    same time, so messages of one topic keep their order.
+
+    When the queue is full the oldest pending payload of the same topic is
+    dropped; if that topic has nothing pending, the oldest payload of the topic
+    with the longest backlog is dropped instead.
+
+    With coalescing enabled, a worker that takes a payload while later ones of
+    the same topic are pending asks coalesce_key(topic, payload) for their keys.
+    If a later payload has the same key, the taken one is superseded and dropped
+    before it is decoded. Keys are computed on the workers, at most once per
+    payload, and only for topics with a backlog. Payloads without a key (None)
+    are never coalesced.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str, bytes], Any],
+        max_size: int = DEFAULT_INGEST_QUEUE_SIZE,
+        workers: int = DEFAULT_INGEST_WORKERS,
+        coalesce_key: Callable[[str, bytes], Hashable | None] | None = None,
+        coalesce: bool = DEFAULT_INGEST_COALESCE,
+    ):
+        self.__handler = handler
+        self.__max_size = max(max_size, 1)
+        self.__workers = max(workers, 1)
+        self.__coalesce_key = coalesce_key if coalesce else None
+        self.__cond = threading.Condition()
+        # topic -> [payload, receive time, coalesce key or _NO_KEY]
+        self.__pending: dict[str, deque[list[Any]]] = {}
+        self.__ready: deque[str] = deque()
+        self.__busy: set[str] = set()
+        self.__threads: list[threading.Thread] = []
+        self.__running = False
+
+        self.__size = 0
+        self.__max_depth = 0
+        self.__received = 0
+        self.__processed = 0
+        self.__dropped = 0
+        self.__coalesced = 0
+        self.__errors = 0
+        self.__max_wait = 0.0
+
+    def start(self):
+        with self.__cond:
+            if self.__running:
+                return
+            self.__running = True
+        for i in range(self.__workers):
+            thread = threading.Thread(
+                target=self.__work, name=f"ecoflow-ingest-{i}", daemon=True
+            )
+            thread.start()
+            self.__threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        with self.__cond:
+            self.__running = False
+            self.__pending.clear()
+            self.__ready.clear()
+            self.__size = 0
+            self.__cond.notify_all()
+        for thread in self.__threads:
+            thread.join(timeout)
+        self.__threads.clear()
+
+    def submit(self, topic: str, payload: bytes):
+        with self.__cond:
+            self.__received += 1
+            queue = self.__pending.get(topic)
+            if self.__size >= self.__max_size:
+                self.__drop_oldest(topic)
+                queue = self.__pending.get(topic)
+
+            if queue is None:
+                queue = self.__pending[topic] = deque()
+            queue.append([payload, time.monotonic(), _NO_KEY])
+            self.__size += 1
+            self.__max_depth = max(self.__max_depth, self.__size)
+
+            if len(queue) == 1 and topic not in self.__busy:
+                self.__ready.append(topic)
+                self.__cond.notify()
+
+    def stats(self) -> dict[str, Any]:
+        with self.__cond:
+            return {
+                "queue_depth": self.__size,
+                "queue_max_depth": self.__max_depth,
+                "queue_size": self.__max_size,
+                "workers": self.__workers,
+                "received": self.__received,
+                "processed": self.__processed,
+                "dropped": self.__dropped,
+                "coalesced": self.__coalesced,
+                "errors": self.__errors,
+                "max_wait_sec": round(self.__max_wait, 3),
+            }
+
+    def __drop_oldest(self, topic: str):
+        victim = topic
+        if not self.__pending.get(victim):
+            victim = max(self.__pending, key=lambda t: len(self.__pending[t]))
+        queue = self.__pending[victim]
+        queue.popleft()
+        if not queue:
+            # a stale entry may stay in __ready, the workers skip it
+            del self.__pending[victim]
+        self.__size -= 1
+        self.__dropped += 1
+        _LOGGER.debug("Ingest queue full, dropped oldest payload of %s", victim)
+
+    def __key(self, topic: str, entry: list[Any]) -> Hashable | None:
+        key = entry[2]
+        if key is _NO_KEY:
+            try:
+                key = self.__coalesce_key(topic, entry[0])
+            except Exception as error:
+                _LOGGER.debug("No coalesce key for %s: %s", topic, error)
+                key = None
+            entry[2] = key
+        return key
+
+    def __superseded(self, topic: str, entry: list[Any]) -> bool:
+        # True if a later payload of the topic, still pending, has the same key
+        if self.__coalesce_key is None:
+            return False
+        with self.__cond:
+            later = list(self.__pending.get(topic, ()))
+        if not later:
+            return False
+        key = self.__key(topic, entry)
+        if key is None:
+            return False
+        for other in later:
+            if self.__key(topic, other) == key:
+                with self.__cond:
+                    # it may have been dropped from a full queue meanwhile
+                    return any(e is other for e in self.__pending.get(topic, ()))
+        return False
+
+    def __work(self):
+        while True:
+            with self.__cond:
+                while self.__running and not self.__ready:
+                    self.__cond.wait()
+                if not self.__running:
+                    return
+                topic = self.__ready.popleft()
+                if topic in self.__busy or topic not in self.__pending:
+                    continue
+                queue = self.__pending[topic]
+                entry = queue.popleft()
+                if not queue:
+                    del self.__pending[topic]
+                self.__size -= 1
+                self.__busy.add(topic)
+                self.__max_wait = max(self.__max_wait, time.monotonic() - entry[1])
+
+            failed = True
+            superseded = False
+            try:
+                superseded = self.__superseded(topic, entry)
+                if not superseded:
+                    self.__handler(topic, entry[0])
+                failed = False
+            except UnicodeDecodeError as error:
+                _LOGGER.error(
+                    f"UnicodeDecodeError: {error}. Ignoring message and waiting for the next one."
+                )
+            except Exception as error:
+                _LOGGER.error(
+                    "Error processing message on %s: %s", topic, error, exc_info=True
+                )
+            finally:
+                with self.__cond:
+                    self.__busy.discard(topic)
+                    if superseded:
+                        self.__coalesced += 1
+                    else:
+                        self.__processed += 1
+                    if failed:
+                        self.__errors += 1
+                    if topic in self.__pending:
+                        self.__ready.append(topic)
+                        self.__cond.notify()
@@ -10,7 +10,13 @@ from paho.mqtt.client import PayloadType
 
 from ..device_data import DeviceData
 from ..devices import DiagnosticDevice, EcoflowDeviceInfo
+from ..devices.registry import LazyDeviceRegistry, devices
 from . import EcoflowApiClient, EcoflowException
+from .ingest import (
+    DEFAULT_INGEST_COALESCE,
+    DEFAULT_INGEST_QUEUE_SIZE,
+    DEFAULT_INGEST_WORKERS,
+)
 from .message import Message
 
 _LOGGER = logging.getLogger(__name__)
@@ -24,9 +30,17 @@ class PrivateAPIMessageProtocol(Protocol):
 
 class EcoflowPrivateApiClient(EcoflowApiClient):
     def __init__(
-        self, api_domain: str, ecoflow_username: str, ecoflow_password: str, group: str
+        self,
+        api_domain: str,
+        ecoflow_username: str,
+        ecoflow_password: str,
+        group: str,
+        session: aiohttp.ClientSession | None = None,
+        ingest_queue_size: int = DEFAULT_INGEST_QUEUE_SIZE,
+        ingest_workers: int = DEFAULT_INGEST_WORKERS,
+        ingest_coalesce: bool = DEFAULT_INGEST_COALESCE,
     ):
-        super().__init__()
+        super().__init__(session, ingest_queue_size, ingest_workers, ingest_coalesce)
         self.api_domain = api_domain
         self.ecoflow_password = ecoflow_password
         self.ecoflow_username = ecoflow_username
@@ -36,41 +50,72 @@ class EcoflowPrivateApiClient(EcoflowApiClient):
         self.user_name = None
 
     async def login(self):
-        async with aiohttp.ClientSession() as session:
-            url = f"https://{self.api_domain}/auth/login"
-            headers = {"lang": "en_US", "content-type": "application/json"}
-            data = {
-                "email": self.ecoflow_username,
-                "password": base64.b64encode(self.ecoflow_password.encode()).decode(),
-                "scene": "IOT_APP",
-                "userType": "ECOFLOW",
-            }
-
-            _LOGGER.info(f"Login to EcoFlow API {url}")
-
-            resp = await session.post(url, headers=headers, json=data)
-            response = await self._get_json_response(resp)
-
-            try:
-                self.token = response["data"]["token"]
-                self.user_id = response["data"]["user"]["userId"]
-                self.user_name = response["data"]["user"].get("name", "<no user name>")
-            except KeyError as key:
-                raise EcoflowException(
-                    f"Failed to extract key {key} from response: {response}"
-                )
-
-            _LOGGER.info(f"Successfully logged in: {self.user_name}")
-
-            _LOGGER.info("Requesting IoT MQTT credentials")
-            response = await self.__call_api("/iot-auth/app/certification")
-            self._accept_mqqt_certification(response)
-
-            # Should be ANDROID_..str.._user_id !!!
-            self.mqtt_info.client_id = (
-                f"ANDROID_{str(uuid.random_uuid_hex()).upper()}_{self.user_id}"
+        url = f"https://{self.api_domain}/auth/login"
+        headers = {"lang": "en_US", "content-type": "application/json"}
+        data = {
+            "email": self.ecoflow_username,
+            "password": base64.b64encode(self.ecoflow_password.encode()).decode(),
+            "scene": "IOT_APP",
+            "userType": "ECOFLOW",
+        }
+
+        _LOGGER.info(f"Login to EcoFlow API {url}")
+
+        response = await self._call_with_retry(
+            self.api_domain,
+            lambda: self.http.request(
+                "POST",
+                url,
+                "/auth/login",
+                self._get_json_response,
+                headers=headers,
+                json=data,
+            ),
+        )
+
+        try:
+            self.token = response["data"]["token"]
+            self.user_id = response["data"]["user"]["userId"]
+            self.user_name = response["data"]["user"].get("name", "<no user name>")
+        except KeyError as key:
+            raise EcoflowException(
+                f"Failed to extract key {key} from response: {response}"
             )
 
+        _LOGGER.info(f"Successfully logged in: {self.user_name}")
+
+        _LOGGER.info("Requesting IoT MQTT credentials")
+        response = await self.__call_api("/iot-auth/app/certification")
+        self._accept_mqqt_certification(response)
+
+        # Should be ANDROID_..str.._user_id !!!
+        self.mqtt_info.client_id = (
+            f"ANDROID_{str(uuid.random_uuid_hex()).upper()}_{self.user_id}"
+        )
+
+    def _credentials_account(self) -> str:
+        return f"{self.api_domain}/{self.ecoflow_username}"
+
+    def _topic_owner(self) -> Any:
+        return self.user_id
+
+    def export_credentials(self) -> dict[str, Any]:
+        credentials = super().export_credentials()
+        credentials["token"] = self.token
+        credentials["user_id"] = self.user_id
+        credentials["user_name"] = self.user_name
+        return credentials
+
+    def restore_credentials(self, credentials: dict[str, Any]) -> bool:
+        if not credentials.get("token") or not credentials.get("user_id"):
+            return False
+        if not super().restore_credentials(credentials):
+            return False
+        self.token = credentials["token"]
+        self.user_id = credentials["user_id"]
+        self.user_name = credentials.get("user_name")
+        return True
+
     # Failed to connect to MQTT: not authorised
     def gen_client_id(self):
         base = f"ANDROID_{str(uuid.random_uuid_hex()).upper()}_{self.user_id}"
@@ -93,7 +138,7 @@ class EcoflowPrivateApiClient(EcoflowApiClient):
     async def fetch_all_available_devices(self):
         return []
 
-    async def quota_all(self, device_sn: str | None):
+    async def _quota_all(self, device_sn: str | None):
         if not device_sn:
             target_devices = self.devices.items()
         else:
@@ -102,6 +147,9 @@ class EcoflowPrivateApiClient(EcoflowApiClient):
         for sn, device in target_devices:
             self.send_get_message(sn, device.private_api_get_quota())
 
+    def _device_registry(self) -> LazyDeviceRegistry:
+        return devices
+
     def configure_device(self, device_data: DeviceData):
         if device_data.parent is not None:
             info = self.__create_device_info(
@@ -112,8 +160,6 @@ class EcoflowPrivateApiClient(EcoflowApiClient):
                 device_data.sn, device_data.name, device_data.device_type
             )
 
-        from ..devices.registry import devices
-
         if device_data.device_type in devices:
             device = devices[device_data.device_type](info, device_data)
         elif device_data.parent.device_type in devices:
@@ -146,25 +192,32 @@ class EcoflowPrivateApiClient(EcoflowApiClient):
     async def __call_api(
         self, endpoint: str, params: dict[str:any] | None = None
     ) -> dict:
-        async with aiohttp.ClientSession() as session:
-            headers = {
-                "lang": "en_US",
-                "authorization": f"Bearer {self.token}",
-                "content-type": "application/json",
-            }
-            user_data = {"userId": self.user_id}
-            req_params = {}
-            if params is not None:
-                req_params.update(params)
-
-            resp = await session.get(
+        headers = {
+            "lang": "en_US",
+            "authorization": f"Bearer {self.token}",
+            "content-type": "application/json",
+        }
+        user_data = {"userId": self.user_id}
+        req_params = {}
+        if params is not None:
+            req_params.update(params)
+
+        async def handle(resp):
+            _LOGGER.info(f"Request: {endpoint} {req_params}: got {resp}")
+            return await self._get_json_response(resp)
+
+        return await self._call_with_retry(
+            self.api_domain,
+            lambda: self.http.request(
+                "GET",
                 f"https://{self.api_domain}{endpoint}",
+                endpoint,
+                handle,
                 data=user_data,
                 params=req_params,
                 headers=headers,
-            )
-            _LOGGER.info(f"Request: {endpoint} {req_params}: got {resp}")
-            return await self._get_json_response(resp)
+            ),
+        )
 
     def send_get_message(self, device_sn: str, command: dict | Message):
         if isinstance(command, PrivateAPIMessageProtocol):
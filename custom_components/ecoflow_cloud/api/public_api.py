@@ -1,3 +1,5 @@
+import asyncio
+import functools
 import hashlib
 import hmac
 import logging
@@ -8,10 +10,38 @@ import aiohttp
 
 from ..device_data import DeviceData
 from ..devices import DiagnosticDevice, EcoflowDeviceInfo
-from . import EcoflowApiClient
+from ..devices.registry import LazyDeviceRegistry, device_by_product
+from . import EcoflowApiClient, EcoflowCircuitOpenError
+from .ingest import (
+    DEFAULT_INGEST_COALESCE,
+    DEFAULT_INGEST_QUEUE_SIZE,
+    DEFAULT_INGEST_WORKERS,
+)
+from .rate_limit import DEFAULT_RATE_LIMITS, EcoflowRequestScheduler, Priority
 
 _LOGGER = logging.getLogger(__name__)
 
+# /device/quota/all requests in flight at once during quota_all(None); setup
+# keeps the default, the scheduler's "quota" budget bounds the rate anyway
+DEFAULT_QUOTA_CONCURRENCY = 8
+# how long a /device/list result is reused, unless a status message arrives
+DEFAULT_DEVICE_LIST_TTL_SEC = 60
+
+
+@functools.cache
+def _product_prefixes() -> tuple[tuple[str, str], ...]:
+    # reversed: the last matching product wins, as when every product was checked
+    return tuple((product.lower(), product) for product in reversed(device_by_product))
+
+
+@functools.cache
+def _product_by_device_name(device_name: str) -> str | None:
+    device_name = device_name.lower()
+    for prefix, product in _product_prefixes():
+        if device_name.startswith(prefix):
+            return product
+    return None
+
 # from FB
 # client_id limits for MQTT connections
 # If you are using MQTT to connect to the API be aware that only 10 unique client IDs are allowed per day.
@@ -21,8 +51,25 @@ _LOGGER = logging.getLogger(__name__)
 
 
 class EcoflowPublicApiClient(EcoflowApiClient):
-    def __init__(self, api_domain: str, access_key: str, secret_key: str, group: str):
-        super().__init__()
+    def __init__(
+        self,
+        api_domain: str,
+        access_key: str,
+        secret_key: str,
+        group: str,
+        session: aiohttp.ClientSession | None = None,
+        quota_concurrency: int = DEFAULT_QUOTA_CONCURRENCY,
+        rate_limits: dict[str, tuple[float, int]] = DEFAULT_RATE_LIMITS,
+        ingest_queue_size: int = DEFAULT_INGEST_QUEUE_SIZE,
+        ingest_workers: int = DEFAULT_INGEST_WORKERS,
+        ingest_coalesce: bool = DEFAULT_INGEST_COALESCE,
+    ):
+        super().__init__(session, ingest_queue_size, ingest_workers, ingest_coalesce)
+        self.__quota_semaphore = asyncio.Semaphore(max(quota_concurrency, 1))
+        self.scheduler = EcoflowRequestScheduler(rate_limits)
+        self.__device_list: list[EcoflowDeviceInfo] | None = None
+        self.__device_list_time = 0.0
+        self.__device_list_generation = 0
         self.api_domain = api_domain
         self.access_key = access_key
         self.secret_key = secret_key
@@ -32,36 +79,58 @@ class EcoflowPublicApiClient(EcoflowApiClient):
 
     async def login(self):
         _LOGGER.info("Requesting IoT MQTT credentials")
-        response = await self.call_api("/certification")
+        response = await self.call_api("/certification", priority=Priority.USER)
         self._accept_mqqt_certification(response)
         self.mqtt_info.client_id = (
             f"Hassio-{self.mqtt_info.username}-{self.group.replace(' ', '-')}"
         )
 
-    async def fetch_all_available_devices(self) -> list[EcoflowDeviceInfo]:
+    def _credentials_account(self) -> str:
+        return f"{self.api_domain}/{self.access_key}/{self.group}"
+
+    def invalidate_device_list(self):
+        # online states changed, the next fetch_all_available_devices() asks again;
+        # event loop only, status messages schedule it there (see async_setup_entry)
+        self.__device_list_generation += 1
+        self.__device_list = None
+
+    async def fetch_all_available_devices(
+        self,
+        priority: Priority = Priority.USER,
+        max_age: float = DEFAULT_DEVICE_LIST_TTL_SEC,
+    ) -> list[EcoflowDeviceInfo]:
+        device_list = self.__device_list
+        if (
+            device_list is not None
+            and time.monotonic() - self.__device_list_time < max_age
+        ):
+            return list(device_list)
+
         _LOGGER.info("Requesting all devices")
-        response = await self.call_api("/device/list")
+        generation = self.__device_list_generation
+        response = await self.call_api("/device/list", priority=priority)
         result = list()
         for device in response["data"]:
             _LOGGER.debug(str(device))
             sn = device["sn"]
             product_name = device.get("productName", "undefined")
-            if product_name == "undefined":
-                from ..devices.registry import device_by_product
-
-                device_list = list(device_by_product.keys())
-                for devicetype in device_list:
-                    if "deviceName" in device and device[
-                        "deviceName"
-                    ].lower().startswith(devicetype.lower()):
-                        product_name = devicetype
+            if product_name == "undefined" and "deviceName" in device:
+                product_name = (
+                    _product_by_device_name(device["deviceName"]) or product_name
+                )
             device_name = device.get("deviceName", f"{product_name}-{sn}")
             status = int(device["online"])
             result.append(
                 self.__create_device_info(sn, device_name, product_name, status)
             )
 
-        return result
+        if generation == self.__device_list_generation:
+            self.__device_list = result
+            self.__device_list_time = time.monotonic()
+        return list(result)
+
+    def _device_registry(self) -> LazyDeviceRegistry:
+        return device_by_product
 
     def configure_device(self, device_data: DeviceData):
         if device_data.parent is not None:
@@ -73,8 +142,6 @@ class EcoflowPublicApiClient(EcoflowApiClient):
                 device_data.sn, device_data.name, device_data.device_type
             )
 
-        from custom_components.ecoflow_cloud.devices.registry import device_by_product
-
         if device_data.device_type in device_by_product:
             device = device_by_product[device_data.device_type](info, device_data)
         elif (
@@ -90,58 +157,92 @@ class EcoflowPublicApiClient(EcoflowApiClient):
         self.add_device(device)
         return device
 
-    async def quota_all(self, device_sn: str | None):
+    async def _quota_all(self, device_sn: str | None):
         if not device_sn:
-            target_devices = self.devices.keys()
-            # update all statuses
-            devices = await self.fetch_all_available_devices()
-            for device in devices:
-                if device.sn in self.devices:
-                    self.devices[device.sn].data.update_status(
-                        {"params": {"status": device.status}}
-                    )
+            target_devices = list(self.devices.keys())
+            # update all statuses while the quotas are fetched, a device that is
+            # being fetched on its own already is joined
+            results = await asyncio.gather(
+                self.__update_statuses(),
+                *(
+                    self.quota_flight.run(sn, lambda sn=sn: self.__quota(sn))
+                    for sn in target_devices
+                ),
+                return_exceptions=True,
+            )
+            if isinstance(results[0], BaseException):
+                raise results[0]
         else:
-            target_devices = [device_sn]
+            await self.__quota(device_sn)
+
+    async def __update_statuses(self):
+        devices = await self.fetch_all_available_devices(Priority.BACKGROUND)
+        for device in devices:
+            if device.sn in self.devices:
+                self.devices[device.sn].data.update_status(
+                    {"params": {"status": device.status}}
+                )
 
-        for sn in target_devices:
+    async def __quota(self, sn: str):
+        # any number run at once, the semaphore bounds the calls in flight; a
+        # failure is logged here and does not cancel the other devices
+        async with self.__quota_semaphore:
             try:
                 raw = await self.call_api("/device/quota/all", {"sn": sn})
                 if "data" in raw:
                     self.devices[sn].data.update_data({"params": raw["data"]})
+            except EcoflowCircuitOpenError as exception:
+                _LOGGER.debug("Skipped quota of %s: %s", sn, exception)
             except Exception as exception:
                 _LOGGER.error(exception, exc_info=True)
                 _LOGGER.error("Error retrieving %s", sn)
 
-    async def call_api(self, endpoint: str, params: dict[str, str] = None) -> dict:
+    async def call_api(
+        self,
+        endpoint: str,
+        params: dict[str, str] = None,
+        priority: Priority = Priority.BACKGROUND,
+    ) -> dict:
+        # every attempt waits for its own token and is signed anew
+        return await self._call_with_retry(
+            self.api_domain, lambda: self.__call_api_once(endpoint, params, priority)
+        )
+
+    async def __call_api_once(
+        self, endpoint: str, params: dict[str, str] | None, priority: Priority
+    ) -> dict:
+        sn = params.get("sn") if params is not None else None
+        await self.scheduler.acquire(endpoint, sn, priority)
         self.nonce = str(random.randint(10000, 1000000))
         self.timestamp = str(int(time.time() * 1000))
-        async with aiohttp.ClientSession() as session:
-            params_str = ""
-            if params is not None:
-                params_str = self.__sort_and_concat_params(params)
-
-            sign = self.__gen_sign(params_str)
-
-            headers = {
-                "accessKey": self.access_key,
-                "nonce": self.nonce,
-                "timestamp": self.timestamp,
-                "sign": sign,
-            }
-
-            _LOGGER.debug("Request: %s %s.", str(endpoint), str(params_str))
-            resp = await session.get(
-                f"https://{self.api_domain}/iot-open/sign{endpoint}?{params_str}",
-                headers=headers,
-            )
-            json_resp = await self._get_json_response(resp)
-            _LOGGER.debug(
-                "Request: %s %s. Response : %s",
-                str(endpoint),
-                str(params_str),
-                str(json_resp),
-            )
-            return json_resp
+        params_str = ""
+        if params is not None:
+            params_str = self.__sort_and_concat_params(params)
+
+        sign = self.__gen_sign(params_str)
+
+        headers = {
+            "accessKey": self.access_key,
+            "nonce": self.nonce,
+            "timestamp": self.timestamp,
+            "sign": sign,
+        }
+
+        _LOGGER.debug("Request: %s %s.", str(endpoint), str(params_str))
+        json_resp = await self.http.request(
+            "GET",
+            f"https://{self.api_domain}/iot-open/sign{endpoint}?{params_str}",
+            endpoint,
+            self._get_json_response,
+            headers=headers,
+        )
+        _LOGGER.debug(
+            "Request: %s %s. Response : %s",
+            str(endpoint),
+            str(params_str),
+            str(json_resp),
+        )
+        return json_resp
 
     def __create_device_info(
         self, device_sn: str, device_name: str, device_type: str, status: int = -1
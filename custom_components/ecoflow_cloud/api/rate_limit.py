@@ -0,0 +1,164 @@
+import asyncio
+import enum
+import time
+from collections import OrderedDict, deque
+from typing import Any
+
+# endpoint class -> (requests per second, burst)
+DEFAULT_RATE_LIMITS: dict[str, tuple[float, int]] = {
+    "certification": (0.1, 2),
+    "device_list": (0.2, 2),
+    "quota": (2.0, 5),
+    "other": (1.0, 3),
+}
+
+_ENDPOINT_CLASSES = {
+    "/certification": "certification",
+    "/device/list": "device_list",
+    "/device/quota/all": "quota",
+}
+
+
+class Priority(enum.IntEnum):
+    USER = 0
+    BACKGROUND = 1
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.__tokens = float(burst)
+        self.__updated = time.monotonic()
+
+    def __refill(self):
+        now = time.monotonic()
+        elapsed = now - self.__updated
+        self.__tokens = min(self.burst, self.__tokens + elapsed * self.rate)
+        self.__updated = now
+
+    def tokens(self) -> float:
+        self.__refill()
+        return self.__tokens
+
+    def wait_time(self) -> float:
+        # seconds until a token is available, 0 if there is one
+        self.__refill()
+        if self.__tokens >= 1:
+            return 0
+        return (1 - self.__tokens) / self.rate
+
+    def take(self):
+        self.__refill()
+        self.__tokens -= 1
+
+
+class _EndpointClass:
+    def __init__(self, rate: float, burst: int):
+        self.bucket = TokenBucket(rate, burst)
+        # one lane per priority, each a round robin of serial number -> waiters
+        self.lanes: list[OrderedDict[str, deque[asyncio.Future]]] = [
+            OrderedDict() for _ in Priority
+        ]
+        self.timer: asyncio.TimerHandle | None = None
+        self.granted = 0
+        self.delayed = 0
+        self.max_wait = 0.0
+
+    def queued(self) -> dict[str, int]:
+        return {
+            priority.name.lower(): sum(len(q) for q in self.lanes[priority].values())
+            for priority in Priority
+        }
+
+
+class EcoflowRequestScheduler:
+    """Budgets REST requests with a token bucket per endpoint class.
+
+    A request waits in acquire() until its class has a token. Waiting
+    requests are served by priority (user triggered before background
+    refreshes) and, within a priority, round robin across serial numbers, so
+    one device can't use up the budget of the others. Event loop only.
+    """
+
+    def __init__(self, limits: dict[str, tuple[float, int]] = DEFAULT_RATE_LIMITS):
+        self.__classes = {
+            name: _EndpointClass(rate, burst) for name, (rate, burst) in limits.items()
+        }
+
+    def __class_of(self, endpoint: str) -> _EndpointClass:
+        name = _ENDPOINT_CLASSES.get(endpoint, "other")
+        return self.__classes.get(name) or self.__classes["other"]
+
+    async def acquire(
+        self,
+        endpoint: str,
+        sn: str | None = None,
+        priority: Priority = Priority.BACKGROUND,
+    ):
+        endpoint_class = self.__class_of(endpoint)
+        if not any(endpoint_class.lanes) and endpoint_class.bucket.wait_time() == 0:
+            endpoint_class.bucket.take()
+            endpoint_class.granted += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        lane = endpoint_class.lanes[priority]
+        key = sn or ""
+        if key not in lane:
+            lane[key] = deque()
+        lane[key].append(future)
+        endpoint_class.delayed += 1
+        start = time.monotonic()
+        if endpoint_class.timer is None:
+            self.__dispatch(endpoint_class)
+        try:
+            await future
+        except asyncio.CancelledError:
+            queue = lane.get(key)
+            if queue is not None and future in queue:
+                queue.remove(future)
+                if not queue:
+                    del lane[key]
+            raise
+        waited = time.monotonic() - start
+        endpoint_class.max_wait = max(endpoint_class.max_wait, waited)
+
+    def __dispatch(self, endpoint_class: _EndpointClass):
+        endpoint_class.timer = None
+        while True:
+            lane = next((lane for lane in endpoint_class.lanes if lane), None)
+            if lane is None:
+                return
+            wait = endpoint_class.bucket.wait_time()
+            if wait > 0:
+                endpoint_class.timer = asyncio.get_running_loop().call_later(
+                    wait, self.__dispatch, endpoint_class
+                )
+                return
+
+            key, queue = next(iter(lane.items()))
+            future = queue.popleft()
+            if queue:
+                lane.move_to_end(key)
+            else:
+                del lane[key]
+            if future.done():
+                continue
+            endpoint_class.bucket.take()
+            endpoint_class.granted += 1
+            future.set_result(None)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            name: {
+                "rate_per_sec": endpoint_class.bucket.rate,
+                "burst": endpoint_class.bucket.burst,
+                "tokens": round(endpoint_class.bucket.tokens(), 2),
+                "queued": endpoint_class.queued(),
+                "granted": endpoint_class.granted,
+                "delayed": endpoint_class.delayed,
+                "max_wait_sec": round(endpoint_class.max_wait, 3),
+            }
+            for name, endpoint_class in self.__classes.items()
+        }
@@ -0,0 +1,114 @@
+import logging
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.util import dt
+
+from .resilience import retry_delay
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_RECONNECT_MIN_DELAY_SEC = 5
+DEFAULT_RECONNECT_MAX_DELAY_SEC = 300
+DEFAULT_RECONNECT_JITTER = 0.2
+
+
+class EcoflowReconnectSupervisor:
+    """Runs MQTT reconnect attempts on its own thread.
+
+    Callers only request a reconnect; requests that arrive while an attempt is
+    pending or running are merged into it. A failed attempt is retried with
+    exponential backoff (min_delay * 2^n, capped at max_delay) and +/- jitter
+    until it succeeds or the supervisor is stopped.
+    """
+
+    def __init__(
+        self,
+        reconnect: Callable[[], bool],
+        min_delay: float = DEFAULT_RECONNECT_MIN_DELAY_SEC,
+        max_delay: float = DEFAULT_RECONNECT_MAX_DELAY_SEC,
+        jitter: float = DEFAULT_RECONNECT_JITTER,
+    ):
+        self.__reconnect = reconnect
+        self.__min_delay = min_delay
+        self.__max_delay = max_delay
+        self.__jitter = jitter
+        self.__requested = threading.Event()
+        self.__stopped = threading.Event()
+        self.__thread: threading.Thread | None = None
+
+        self.in_progress = False
+        self.requests = 0
+        self.attempts = 0
+        self.failures = 0
+        self.last_attempt = None
+        self.last_success = None
+
+    def start(self):
+        if self.__thread is not None:
+            return
+        self.__stopped.clear()
+        self.__thread = threading.Thread(
+            target=self.__run, name="ecoflow-mqtt-reconnect", daemon=True
+        )
+        self.__thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self.__stopped.set()
+        self.__requested.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+            self.__thread = None
+
+    def request_reconnect(self) -> bool:
+        # False if the request was merged into a pending or running attempt
+        self.requests += 1
+        if self.in_progress or self.__requested.is_set():
+            return False
+        self.__requested.set()
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_progress": self.in_progress,
+            "requests": self.requests,
+            "attempts": self.attempts,
+            "failures": self.failures,
+            "last_attempt": self.last_attempt,
+            "last_success": self.last_success,
+        }
+
+    def backoff_delay(self, failures: int) -> float:
+        return retry_delay(failures, self.__min_delay, self.__max_delay, self.__jitter)
+
+    def __run(self):
+        while True:
+            self.__requested.wait()
+            if self.__stopped.is_set():
+                return
+            self.in_progress = True
+            self.__requested.clear()
+
+            failures = 0
+            while not self.__stopped.is_set():
+                self.attempts += 1
+                self.last_attempt = dt.utcnow()
+                try:
+                    success = self.__reconnect()
+                except Exception as error:
+                    _LOGGER.error("MQTT reconnect failed: %s", error)
+                    success = False
+
+                if success:
+                    self.last_success = self.last_attempt
+                    break
+
+                failures += 1
+                self.failures += 1
+                delay = self.backoff_delay(failures)
+                _LOGGER.info("MQTT reconnect failed, next attempt in %.1f s", delay)
+                if self.__stopped.wait(delay):
+                    return
+
+            self.in_progress = False
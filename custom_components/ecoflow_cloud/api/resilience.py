@@ -0,0 +1,108 @@
+import enum
+import random
+import time
+from typing import Any
+
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_RETRY_MIN_DELAY_SEC = 1.0
+DEFAULT_RETRY_MAX_DELAY_SEC = 10.0
+DEFAULT_RETRY_JITTER = 0.2
+DEFAULT_BREAKER_FAILURE_THRESHOLD = 5
+DEFAULT_BREAKER_RESET_SEC = 60.0
+
+
+class BreakerState(enum.StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def retry_delay(
+    attempt: int,
+    min_delay: float = DEFAULT_RETRY_MIN_DELAY_SEC,
+    max_delay: float = DEFAULT_RETRY_MAX_DELAY_SEC,
+    jitter: float = DEFAULT_RETRY_JITTER,
+) -> float:
+    # attempt 1 -> min_delay, doubled per attempt up to max_delay, +/- jitter
+    delay = min(max_delay, min_delay * (2 ** max(attempt - 1, 0)))
+    return delay * random.uniform(1 - jitter, 1 + jitter)
+
+
+class CircuitBreaker:
+    """Stops calls to a host after failure_threshold failures in a row.
+
+    While open every call is refused; after reset_sec one trial call is let
+    through (half open), its success closes the circuit, its failure opens it
+    again. A trial that ends without either (cancelled) must be released, the
+    next call is then the trial. Event loop only.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_BREAKER_FAILURE_THRESHOLD,
+        reset_sec: float = DEFAULT_BREAKER_RESET_SEC,
+    ):
+        self.__failure_threshold = failure_threshold
+        self.__reset_sec = reset_sec
+        self.__state = BreakerState.CLOSED
+        self.__failures = 0
+        self.__opened_at = 0.0
+        self.__trial_running = False
+
+        self.opened = 0
+        self.refused = 0
+
+    @property
+    def state(self) -> BreakerState:
+        if (
+            self.__state == BreakerState.OPEN
+            and time.monotonic() - self.__opened_at >= self.__reset_sec
+        ):
+            self.__state = BreakerState.HALF_OPEN
+        return self.__state
+
+    def retry_in(self) -> float:
+        return max(0.0, self.__opened_at + self.__reset_sec - time.monotonic())
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == BreakerState.CLOSED:
+            return True
+        if state == BreakerState.HALF_OPEN and not self.__trial_running:
+            self.__trial_running = True
+            return True
+        self.refused += 1
+        return False
+
+    def record_success(self):
+        self.__state = BreakerState.CLOSED
+        self.__failures = 0
+        self.__trial_running = False
+
+    def release_trial(self):
+        # the trial call ended without a result, e.g. it was cancelled
+        self.__trial_running = False
+
+    def record_failure(self):
+        self.__failures += 1
+        self.__trial_running = False
+        if (
+            self.__state == BreakerState.HALF_OPEN
+            or self.__failures >= self.__failure_threshold
+        ):
+            if self.__state != BreakerState.OPEN:
+                self.opened += 1
+            self.__state = BreakerState.OPEN
+            self.__opened_at = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        state = self.state
+        return {
+            "state": str(state),
+            "failures": self.__failures,
+            "opened": self.opened,
+            "refused": self.refused,
+            "retry_in_sec": round(self.retry_in(), 1)
+            if state == BreakerState.OPEN
+            else None,
+        }
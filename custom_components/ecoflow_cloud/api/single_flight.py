@@ -0,0 +1,51 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class EcoflowSingleFlight:
+    """Deduplicates concurrent calls of the same kind (event loop only).
+
+    A call for a key that is already running joins it and gets its result
+    instead of starting another one. A call within min_interval seconds of the
+    start of the previous real call for the key is skipped and returns None.
+    """
+
+    def __init__(self, min_interval: float):
+        self.__min_interval = min_interval
+        self.__in_flight: dict[Hashable, asyncio.Future] = {}
+        self.__last_call: dict[Hashable, float] = {}
+
+        self.calls = 0
+        self.joined = 0
+        self.throttled = 0
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        in_flight = self.__in_flight.get(key)
+        if in_flight is not None:
+            self.joined += 1
+            return await asyncio.shield(in_flight)
+
+        now = time.monotonic()
+        last_call = self.__last_call.get(key)
+        if last_call is not None and now - last_call < self.__min_interval:
+            self.throttled += 1
+            return None
+
+        self.calls += 1
+        self.__last_call[key] = now
+        # a task, so a cancelled caller doesn't cancel the call for the others
+        task = asyncio.ensure_future(call())
+        self.__in_flight[key] = task
+        task.add_done_callback(lambda _: self.__in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "joined": self.joined,
+            "throttled": self.throttled,
+            "in_flight": len(self.__in_flight),
+            "min_interval_sec": self.__min_interval,
+        }
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Hashable
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from ..devices import BaseDevice, TopicKind
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _DecodeGroup:
+    """Devices of the same class listening to the same topic as the same kind.
+
+    That is the case for sub devices (e.g. Power Kit modules), which get the
+    topics of their parent: the payload is decoded once by the first device and
+    the result is handed to every member, data payloads only to the members
+    whose moduleSn matches.
+    """
+
+    __slots__ = (
+        "kind",
+        "devices",
+        "unfiltered",
+        "by_module_sn",
+        "filtered",
+        "coalescible",
+        "direct",
+        "status",
+    )
+
+    def __init__(self, kind: TopicKind, devices: list[BaseDevice]):
+        from ..devices import TopicKind
+
+        self.kind = kind
+        self.devices = devices
+        self.unfiltered: list[BaseDevice] = []
+        self.by_module_sn: dict[str, list[BaseDevice]] = {}
+        for device in devices:
+            module_sn = device.module_sn()
+            if module_sn is None:
+                self.unfiltered.append(device)
+            else:
+                self.by_module_sn.setdefault(module_sn, []).append(device)
+        self.filtered = kind == TopicKind.DATA and bool(self.by_module_sn)
+        # a shared topic carries data of several modules, a newer payload of one
+        # module does not replace a pending one of another
+        self.coalescible = kind == TopicKind.DATA and len(devices) == 1
+        # decoded into the holder without a message, nothing to filter by moduleSn
+        self.direct = (
+            kind == TopicKind.DATA
+            and len(devices) == 1
+            and not self.by_module_sn
+            and devices[0].writes_data_params()
+        )
+        self.status = kind == TopicKind.STATUS
+
+    def targets(self, raw: dict[str, Any]) -> list[BaseDevice]:
+        if not self.filtered:
+            return self.devices
+        module_devices = self.by_module_sn.get(raw.get("moduleSn"))
+        if module_devices is None:
+            return self.unfiltered
+        return self.unfiltered + module_devices
+
+
+class EcoflowTopicRouter:
+    """Maps every subscribed MQTT topic to the devices (and topic kinds) it feeds.
+
+    The table is rebuilt on add/remove (event loop) and only read on the paho
+    network thread, so each change swaps in new objects instead of mutating the
+    ones a reader may be iterating over.
+    """
+
+    def __init__(self):
+        self.__handlers: dict[str, list[tuple[BaseDevice, TopicKind]]] = {}
+        self.__routes: dict[str, list[_DecodeGroup]] = {}
+        # called (on an ingest worker) after a status topic message was applied
+        self.status_listener: Callable[[], None] | None = None
+
+    def add_device(self, device: BaseDevice):
+        for topic, kind in device.device_info.topic_kinds().items():
+            handlers = [
+                h for h in self.__handlers.get(topic, []) if h[0] is not device
+            ]
+            handlers.append((device, kind))
+            self.__set_handlers(topic, handlers)
+
+    def remove_device(self, device: BaseDevice):
+        for topic in device.device_info.topic_kinds():
+            handlers = [
+                h for h in self.__handlers.get(topic, []) if h[0] is not device
+            ]
+            self.__set_handlers(topic, handlers)
+
+    def __set_handlers(self, topic: str, handlers: list[tuple[BaseDevice, TopicKind]]):
+        if not handlers:
+            self.__handlers.pop(topic, None)
+            self.__routes.pop(topic, None)
+            return
+
+        grouped: dict[tuple[type, TopicKind], list[BaseDevice]] = {}
+        for device, kind in handlers:
+            grouped.setdefault((type(device), kind), []).append(device)
+
+        self.__handlers[topic] = handlers
+        self.__routes[topic] = [
+            _DecodeGroup(kind, devices) for (_, kind), devices in grouped.items()
+        ]
+
+    def topics(self) -> list[str]:
+        return list(self.__handlers.keys())
+
+    def handlers(self, topic: str) -> list[tuple[BaseDevice, TopicKind]]:
+        return self.__handlers.get(topic, [])
+
+    def coalesce_key(self, topic: str, payload: bytes) -> Hashable | None:
+        # only data topics are coalesced, replies and status are never dropped
+        groups = self.__routes.get(topic)
+        if not groups or len(groups) != 1 or not groups[0].coalescible:
+            return None
+        return groups[0].devices[0].coalesce_key(payload)
+
+    def route(self, topic: str, payload: bytes) -> bool:
+        groups = self.__routes.get(topic)
+        if not groups:
+            return False
+        for group in groups:
+            if group.direct:
+                group.devices[0].write_data_topic(payload)
+                continue
+            raw = group.devices[0].decode_topic_data(payload, group.kind)
+            for device in group.targets(raw):
+                device.apply_topic_data(raw, group.kind, payload)
+                _LOGGER.debug(
+                    "Message for %s and Topic %s : %s",
+                    device.device_data.sn,
+                    topic,
+                    payload,
+                )
+            if group.status and self.status_listener is not None:
+                self.status_listener()
+        return True
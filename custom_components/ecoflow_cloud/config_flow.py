@@ -13,6 +13,7 @@ from homeassistant.core import callback
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers import selector
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.device_registry import DeviceRegistry
 from homeassistant.helpers.entity_registry import EntityRegistry
 
@@ -230,6 +231,7 @@ class EcoflowConfigFlow(ConfigFlow, domain=ECOFLOW_DOMAIN):
             self.new_data[CONF_USERNAME],
             self.new_data[CONF_PASSWORD],
             self.new_data[CONF_GROUP],
+            async_get_clientsession(self.hass),
         )
 
         errors: Dict[str, str] = {}
@@ -286,7 +288,10 @@ class EcoflowConfigFlow(ConfigFlow, domain=ECOFLOW_DOMAIN):
                 ),
             )
 
-        device = devices[user_input[CONF_DEVICE_TYPE]]
+        # the device module is imported on first use
+        device = await self.hass.async_add_executor_job(
+            devices.__getitem__, user_input[CONF_DEVICE_TYPE]
+        )
 
         sn = user_input[CONF_DEVICE_ID]
         if CONF_DEVICE_LIST not in self.new_data:
@@ -337,6 +342,7 @@ class EcoflowConfigFlow(ConfigFlow, domain=ECOFLOW_DOMAIN):
             self.new_data[CONF_ACCESS_KEY],
             self.new_data[CONF_SECRET_KEY],
             self.new_data[CONF_GROUP],
+            async_get_clientsession(self.hass),
         )
 
         errors: Dict[str, str] = {}
@@ -446,7 +452,10 @@ class EcoflowConfigFlow(ConfigFlow, domain=ECOFLOW_DOMAIN):
                 ),
             )
 
-        device = device_by_product[user_input[CONF_DEVICE_TYPE]]
+        # the device module is imported on first use
+        device = await self.hass.async_add_executor_job(
+            device_by_product.__getitem__, user_input[CONF_DEVICE_TYPE]
+        )
 
         sn = user_input[CONF_DEVICE_ID]
 
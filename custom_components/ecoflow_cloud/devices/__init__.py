@@ -1,9 +1,12 @@
 import dataclasses
 import datetime
+import enum
+import functools
 import json
 import logging
+import time
 from abc import ABC, abstractmethod
-from collections.abc import Sequence
+from collections.abc import Callable, Hashable, Sequence
 from typing import Any, cast
 
 from homeassistant.components.button import ButtonEntity
@@ -11,17 +14,29 @@ from homeassistant.components.number import NumberEntity
 from homeassistant.components.select import SelectEntity
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.util import dt
 
 from ..api import EcoflowApiClient
 from ..api.message import JSONDict, JSONMessage, Message
 from ..device_data import DeviceData
-from .data_holder import EcoflowDataHolder
+from .data_holder import EcoflowDataHolder, ParamWriter
 
 _LOGGER = logging.getLogger(__name__)
 
+# minimal time between two pushed broadcasts of one device
+DEFAULT_PUSH_DEBOUNCE_SEC = 1.0
+
+
+class TopicKind(enum.Enum):
+    DATA = enum.auto()
+    SET = enum.auto()
+    SET_REPLY = enum.auto()
+    GET = enum.auto()
+    GET_REPLY = enum.auto()
+    STATUS = enum.auto()
+
 
 @dataclasses.dataclass
 class EcoflowDeviceInfo:
@@ -50,11 +65,31 @@ class EcoflowDeviceInfo:
         ]
         return list(filter(lambda v: v is not None, topics))
 
+    def topic_kinds(self) -> dict[str, TopicKind]:
+        # order matters: if two kinds share a topic, the first one wins
+        # (same precedence as the former if/elif chain in update_data)
+        kinds = [
+            (self.data_topic, TopicKind.DATA),
+            (self.set_topic, TopicKind.SET),
+            (self.set_reply_topic, TopicKind.SET_REPLY),
+            (self.get_topic, TopicKind.GET),
+            (self.get_reply_topic, TopicKind.GET_REPLY),
+            (self.status_topic, TopicKind.STATUS),
+        ]
+        result = dict[str, TopicKind]()
+        for topic, kind in kinds:
+            if topic is not None:
+                result.setdefault(topic, kind)
+        return result
+
 
 @dataclasses.dataclass
 class EcoflowBroadcastDataHolder:
     data_holder: EcoflowDataHolder
     changed: bool
+    changed_keys: set[str] = dataclasses.field(default_factory=set)
+    # broadcast by the refresh_period interval rather than pushed by the holder
+    watchdog: bool = False
 
 
 class NoQuotaMessageError(Exception):
@@ -62,8 +97,19 @@ class NoQuotaMessageError(Exception):
 
 
 class EcoflowDeviceUpdateCoordinator(DataUpdateCoordinator[EcoflowBroadcastDataHolder]):
-    def __init__(self, hass, holder: EcoflowDataHolder, refresh_period: int) -> None:
-        """Initialize the coordinator."""
+    def __init__(
+        self,
+        hass,
+        holder: EcoflowDataHolder,
+        refresh_period: int,
+        push_debounce: float | None = DEFAULT_PUSH_DEBOUNCE_SEC,
+    ) -> None:
+        """Initialize the coordinator.
+
+        With push_debounce set, the holder signals new data and the coordinator
+        broadcasts right away, at most once per push_debounce seconds. The
+        refresh_period interval stays as a watchdog tick for the status sensors.
+        """
         super().__init__(
             hass,
             _LOGGER,
@@ -75,12 +121,120 @@ class EcoflowDeviceUpdateCoordinator(DataUpdateCoordinator[EcoflowBroadcastDataH
         self.__last_broadcast = dt.utcnow().replace(
             year=2000, month=1, day=1, hour=0, minute=0, second=0
         )
+        self.__last_params_version = 0
+        self.__push_debounce = push_debounce
+        self.__push_pending = False
+        self.__last_push = 0.0
+        # top level params key -> listeners reading it, None -> every change
+        self.__key_listeners: dict[
+            str | None, list[Callable[[dict[str, Any]], None]]
+        ] = {}
+        # called on every watchdog tick, the other listeners only on changes
+        self.__watchdog_listeners: list[Callable[[], None]] = []
+        if push_debounce is not None:
+            holder.set_update_listener(self.__on_holder_updated)
+
+    def __on_holder_updated(self):
+        # called from the ingest workers as well as from the event loop
+        if self.__push_pending:
+            return
+        self.__push_pending = True
+        self.hass.loop.call_soon_threadsafe(self.__schedule_push)
+
+    @callback
+    def __schedule_push(self):
+        delay = self.__last_push + self.__push_debounce - time.monotonic()
+        if delay > 0:
+            self.hass.loop.call_later(delay, self.__push)
+        else:
+            self.__push()
 
-    async def _async_update_data(self) -> EcoflowBroadcastDataHolder:
+    @callback
+    def __push(self):
+        self.__push_pending = False
+        self.__last_push = time.monotonic()
+        self.async_set_updated_data(self.__broadcast())
+
+    def __broadcast(self, watchdog: bool = False) -> EcoflowBroadcastDataHolder:
         received_time = self.holder.last_received_time()
-        changed = self.__last_broadcast < received_time
+        params_version = self.holder.params_version
+        changed = (
+            self.__last_broadcast < received_time
+            or self.__last_params_version != params_version
+        )
         self.__last_broadcast = received_time
-        return EcoflowBroadcastDataHolder(self.holder, changed)
+        self.__last_params_version = params_version
+        return EcoflowBroadcastDataHolder(
+            self.holder, changed, self.holder.pop_changed_keys(), watchdog
+        )
+
+    async def _async_update_data(self) -> EcoflowBroadcastDataHolder:
+        return self.__broadcast(watchdog=True)
+
+    @callback
+    def async_add_key_listener(
+        self,
+        keys: set[str] | None,
+        update_callback: Callable[[dict[str, Any]], None],
+    ) -> Callable[[], None]:
+        """Call update_callback(params) when one of the params keys changes.
+
+        keys None subscribes to every change. The callback is called right away
+        if the holder already has data. Returns a function that unsubscribes.
+        """
+        index_keys = [None] if keys is None else list(keys)
+        for key in index_keys:
+            self.__key_listeners.setdefault(key, []).append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            for k in index_keys:
+                listeners = self.__key_listeners.get(k)
+                if listeners and update_callback in listeners:
+                    listeners.remove(update_callback)
+                    if not listeners:
+                        del self.__key_listeners[k]
+
+        if self.holder.params:
+            update_callback(self.holder.params)
+        return remove_listener
+
+    @callback
+    def async_add_watchdog_listener(
+        self, update_callback: Callable[[], None]
+    ) -> Callable[[], None]:
+        """Also call update_callback on watchdog ticks that brought nothing new.
+
+        For the listeners counting ticks without data (status sensors); they are
+        called like the others on every other update. Returns a function that
+        unsubscribes.
+        """
+        self.__watchdog_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            if update_callback in self.__watchdog_listeners:
+                self.__watchdog_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        if self.data is not None and self.data.changed_keys:
+            affected = dict.fromkeys(self.__key_listeners.get(None, ()))
+            for key in self.data.changed_keys:
+                listeners = self.__key_listeners.get(key)
+                if listeners:
+                    affected.update(dict.fromkeys(listeners))
+            params = self.holder.params
+            for update_callback in affected:
+                update_callback(params)
+        if self.data is not None and self.data.watchdog and not self.data.changed:
+            # a staleness tick: nothing for the entities reading params
+            for update_callback in list(self.__watchdog_listeners):
+                update_callback()
+            return
+        super().async_update_listeners()
 
 
 class BaseDevice(ABC):
@@ -91,24 +245,32 @@ class BaseDevice(ABC):
         self.device_info: EcoflowDeviceInfo = device_info
         self.power_step: int = device_data.options.power_step
         self.device_data: DeviceData = device_data
-
-    def configure(self, hass: HomeAssistant):
-        if self.device_data.parent is not None:
-            self.data = EcoflowDataHolder(
-                self.private_api_extract_quota_message,
-                self.device_data.sn,
-                self.device_data.options.diagnostic_mode,
-            )
-        else:
-            self.data = EcoflowDataHolder(
-                self.private_api_extract_quota_message,
-                None,
-                self.device_data.options.diagnostic_mode,
-            )
+        # per topic kind, decodes a buffered payload when diagnostics read it
+        self.__decoders = {
+            kind: functools.partial(self.decode_topic_data, kind=kind)
+            for kind in TopicKind
+        }
+
+    def configure(
+        self, hass: HomeAssistant, restored_params: dict[str, Any] | None = None
+    ):
+        self.data = EcoflowDataHolder(
+            self.private_api_extract_quota_message,
+            self.module_sn(),
+            self.device_data.options.diagnostic_mode,
+        )
+        if restored_params:
+            self.data.restore_params(restored_params)
         self.coordinator = EcoflowDeviceUpdateCoordinator(
             hass, self.data, self.device_data.options.refresh_period
         )
 
+    def module_sn(self) -> str | None:
+        # sub devices share the topics of their parent and are told apart by moduleSn
+        if self.device_data.parent is not None:
+            return self.device_data.sn
+        return None
+
     @staticmethod
     def default_charging_power_step() -> int:
         return 100
@@ -161,28 +323,57 @@ class BaseDevice(ABC):
     def buttons(self, client: EcoflowApiClient) -> Sequence[ButtonEntity]:
         return []
 
-    def update_data(self, raw_data: bytes, data_type: str) -> bool:
-        if data_type == self.device_info.data_topic:
-            raw = self._prepare_data_data_topic(raw_data)
-            self.data.update_data(raw)
-        elif data_type == self.device_info.set_topic:
-            raw = self._prepare_data_set_topic(raw_data)
-            self.data.add_set_message(raw)
-        elif data_type == self.device_info.set_reply_topic:
-            raw = self._prepare_data_set_reply_topic(raw_data)
-            self.data.add_set_reply_message(raw)
-        elif data_type == self.device_info.get_topic:
-            raw = self._prepare_data_get_topic(raw_data)
-            self.data.add_get_message(raw)
-        elif data_type == self.device_info.get_reply_topic:
-            raw = self._prepare_data_get_reply_topic(raw_data)
-            self.data.add_get_reply_message(raw)
-        elif data_type == self.device_info.status_topic:
-            raw = self._prepare_data_status_topic(raw_data)
-            self.data.update_status(raw)
+    def coalesce_key(self, raw_data: bytes) -> Hashable | None:
+        # A pending data topic payload is replaced by a newer one with the same key
+        # before it is decoded. Most devices send partial updates, so nothing is
+        # coalesced by default; devices that push their complete state override this.
+        # Only the PowerStream heartbeat does: the public quota messages carry the
+        # params that changed, StreamAC frames only their set fields.
+        return None
+
+    def writes_data_params(self) -> bool:
+        # devices with a _write_data decode their data topic straight into the
+        # holder, when no other device shares the topic (see write_data_topic)
+        return type(self)._write_data is not BaseDevice._write_data
+
+    def write_data_topic(self, payload: bytes):
+        self.data.write_data(
+            lambda set_param: self._write_data(payload, set_param),
+            payload,
+            self.__decoders[TopicKind.DATA],
+        )
+
+    def decode_topic_data(self, raw_data: bytes, kind: TopicKind) -> dict[str, Any]:
+        if kind == TopicKind.DATA:
+            return self._prepare_data_data_topic(raw_data)
+        elif kind == TopicKind.SET:
+            return self._prepare_data_set_topic(raw_data)
+        elif kind == TopicKind.SET_REPLY:
+            return self._prepare_data_set_reply_topic(raw_data)
+        elif kind == TopicKind.GET:
+            return self._prepare_data_get_topic(raw_data)
+        elif kind == TopicKind.GET_REPLY:
+            return self._prepare_data_get_reply_topic(raw_data)
         else:
-            return False
-        return True
+            return self._prepare_data_status_topic(raw_data)
+
+    def apply_topic_data(
+        self, raw: dict[str, Any], kind: TopicKind, payload: bytes | None = None
+    ):
+        # payload: the bytes raw was decoded from, buffered instead of raw
+        decode = self.__decoders[kind] if payload is not None else None
+        if kind == TopicKind.DATA:
+            self.data.update_data(raw, payload, decode)
+        elif kind == TopicKind.SET:
+            self.data.add_set_message(raw, payload, decode)
+        elif kind == TopicKind.SET_REPLY:
+            self.data.add_set_reply_message(raw, payload, decode)
+        elif kind == TopicKind.GET:
+            self.data.add_get_message(raw, payload, decode)
+        elif kind == TopicKind.GET_REPLY:
+            self.data.add_get_reply_message(raw, payload, decode)
+        elif kind == TopicKind.STATUS:
+            self.data.update_status(raw)
 
     def _prepare_data_data_topic(self, raw_data: bytes) -> dict[str, Any]:
         return self._prepare_data(raw_data)
@@ -202,6 +393,11 @@ class BaseDevice(ABC):
     def _prepare_data_status_topic(self, raw_data: bytes) -> dict[str, Any]:
         return self._prepare_data(raw_data)
 
+    def _write_data(self, raw_data: bytes, set_param: ParamWriter) -> bool:
+        # _prepare_data of the data topic without the message: every params value
+        # goes to set_param; False if the payload has no params
+        raise NotImplementedError
+
     def _prepare_data(self, raw_data: bytes) -> dict[str, Any]:
         try:
             try:
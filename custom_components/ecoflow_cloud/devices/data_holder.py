@@ -1,25 +1,88 @@
 import logging
-from collections.abc import Callable
-from typing import Any, TypeVar
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from typing import Any, Generic, TypeVar
 
 import json
-import jsonpath_ng.ext as jp
 from homeassistant.util import dt
 
+from .json_key import MISSING, compile_setter, root_key
+
 _LOGGER = logging.getLogger(__name__)
 
 _T = TypeVar("_T")
 
+# turns a received payload back into the message, for buffered payloads
+MessageDecoder = Callable[[bytes], dict[str, Any]]
+# writes one received params value, EcoflowDataHolder.set_param or dict.__setitem__
+ParamWriter = Callable[[str, Any], Any]
+
+
+# bounds of each message buffer of a device (set, set_reply, get, get_reply, raw_data)
+DEFAULT_BUFFER_MAXLEN = 20
+DEFAULT_BUFFER_MAX_BYTES = 256 * 1024
+
+
+def _approx_size(value: Any) -> int:
+    # rough footprint of a decoded message, only used for the byte cap
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return 64 + sum(len(str(k)) + _approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(_approx_size(v) for v in value)
+    return 16
+
 
-class BoundFifoList(list):
-    def __init__(self, maxlen=20) -> None:
-        super().__init__()
+class BoundRingBuffer(Generic[_T]):
+    """The last messages, newest first, bounded by count and approximate size.
+
+    A message can be kept as its payload bytes and the function decoding it;
+    it is then only decoded when read (diagnostics). The newest message is
+    kept even if it is over max_bytes on its own.
+    """
+
+    def __init__(
+        self,
+        maxlen: int = DEFAULT_BUFFER_MAXLEN,
+        max_bytes: int = DEFAULT_BUFFER_MAX_BYTES,
+    ):
         self.maxlen = maxlen
+        self.max_bytes = max_bytes
+        # (message or payload, decoder of the payload or None, size)
+        self.__entries = deque[tuple[Any, Callable[[bytes], _T] | None, int]]()
+        self.__bytes = 0
+        # appended to from the ingest workers, read on the event loop
+        self.__lock = threading.Lock()
+
+    def append(self, message: _T):
+        self.__add(message, None, _approx_size(message))
 
-    def append(self, __object: _T) -> None:
-        super().insert(0, __object)
-        while len(self) >= self.maxlen:
-            self.pop()
+    def append_encoded(self, payload: bytes, decode: Callable[[bytes], _T]):
+        self.__add(payload, decode, len(payload))
+
+    def __add(self, value: Any, decode: Callable[[bytes], _T] | None, size: int):
+        with self.__lock:
+            entries = self.__entries
+            entries.appendleft((value, decode, size))
+            self.__bytes += size
+            while len(entries) > self.maxlen or (
+                self.__bytes > self.max_bytes and len(entries) > 1
+            ):
+                self.__bytes -= entries.pop()[2]
+
+    def size_bytes(self) -> int:
+        return self.__bytes
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __iter__(self) -> Iterator[_T]:
+        with self.__lock:
+            entries = list(self.__entries)
+        for value, decode, _ in entries:
+            yield value if decode is None else decode(value)
 
 
 class EcoflowDataHolder:
@@ -31,21 +94,25 @@ class EcoflowDataHolder:
     ):
         self.__collect_raw = collect_raw
         self.extract_quota_message = extract_quota_message
-        self.set = BoundFifoList[dict[str, Any]]()
-        self.set_reply = BoundFifoList[dict[str, Any]]()
+        self.set = BoundRingBuffer[dict[str, Any]]()
+        self.set_reply = BoundRingBuffer[dict[str, Any]]()
         self.set_reply_time = dt.utcnow().replace(
             year=2000, month=1, day=1, hour=0, minute=0, second=0
         )
 
         self.module_sn = module_sn
 
-        self.get = BoundFifoList[dict[str, Any]]()
-        self.get_reply = BoundFifoList[dict[str, Any]]()
+        self.get = BoundRingBuffer[dict[str, Any]]()
+        self.get_reply = BoundRingBuffer[dict[str, Any]]()
         self.get_reply_time = dt.utcnow().replace(
             year=2000, month=1, day=1, hour=0, minute=0, second=0
         )
 
         self.params = dict[str, Any]()
+        # bumped on every change of params, received or written locally
+        self.params_version = 0
+        # params restored from the last run, not yet confirmed by the device
+        self.params_stale = False
         self.params_time = dt.utcnow().replace(
             year=2000, month=1, day=1, hour=0, minute=0, second=0
         )
@@ -55,24 +122,71 @@ class EcoflowDataHolder:
             year=2000, month=1, day=1, hour=0, minute=0, second=0
         )
 
-        self.raw_data = BoundFifoList[dict[str, Any]]()
+        self.raw_data = BoundRingBuffer[dict[str, Any]]()
+        self.__update_listener: Callable[[], None] | None = None
+
+        # top level params keys whose value changed since the last pop_changed_keys()
+        self.__changed_keys = set[str]()
+        self.__changed_lock = threading.Lock()
+
+    def set_update_listener(self, listener: Callable[[], None] | None):
+        self.__update_listener = listener
+
+    def __notify_updated(self):
+        if self.__update_listener is not None:
+            self.__update_listener()
+
+    def pop_changed_keys(self) -> set[str]:
+        with self.__changed_lock:
+            keys = self.__changed_keys
+            self.__changed_keys = set()
+        return keys
+
+    def __mark_changed(self, keys: Iterable[str]):
+        with self.__changed_lock:
+            self.__changed_keys.update(keys)
+            self.params_version += 1
 
     def last_received_time(self):
         return max(
             self.status_time, self.params_time, self.get_reply_time, self.set_reply_time
         )
 
-    def add_set_message(self, msg: dict[str, Any]):
-        self.set.append(msg)
+    # payload and decode: the bytes msg was decoded from and its decoder, the
+    # buffers keep those instead of msg
 
-    def add_set_reply_message(self, msg: dict[str, Any]):
-        self.set_reply.append(msg)
+    def add_set_message(
+        self,
+        msg: dict[str, Any],
+        payload: bytes | None = None,
+        decode: MessageDecoder | None = None,
+    ):
+        _buffer(self.set, msg, payload, decode)
+
+    def add_set_reply_message(
+        self,
+        msg: dict[str, Any],
+        payload: bytes | None = None,
+        decode: MessageDecoder | None = None,
+    ):
+        _buffer(self.set_reply, msg, payload, decode)
         self.set_reply_time = dt.utcnow()
+        self.__notify_updated()
 
-    def add_get_message(self, msg: dict[str, Any]):
-        self.get.append(msg)
+    def add_get_message(
+        self,
+        msg: dict[str, Any],
+        payload: bytes | None = None,
+        decode: MessageDecoder | None = None,
+    ):
+        _buffer(self.get, msg, payload, decode)
 
-    def add_get_reply_message(self, msg: dict[str, Any]):
+    def add_get_reply_message(
+        self,
+        msg: dict[str, Any],
+        payload: bytes | None = None,
+        decode: MessageDecoder | None = None,
+    ):
         try:
             result = self.extract_quota_message(msg)
         except:
@@ -81,15 +195,26 @@ class EcoflowDataHolder:
         if result is not None:
             self.update_data(result)
 
-        self.get_reply.append(msg)
+        _buffer(self.get_reply, msg, payload, decode)
         self.get_reply_time = dt.utcnow()
+        self.__notify_updated()
 
     def update_to_target_state(self, target_state: dict[str, Any]):
-        # key can be xpath!
+        # key can be xpath! only values already in params are replaced
+        changed = set[str]()
         for key, value in target_state.items():
-            jp.parse(key).update(self.params, value)
+            if not compile_setter(key)(self.params, value):
+                continue
+            root = root_key(key)
+            if root is None:
+                changed.update(self.params.keys())
+            else:
+                changed.add(root)
 
-        self.params_time = dt.utcnow()
+        if changed:
+            # an optimistic local write, not data received from the device
+            self.__mark_changed(changed)
+            self.__notify_updated()
 
     def update_status(self, raw: dict[str, Any]):
         if raw is None or "params" not in raw or "status" not in raw["params"]:
@@ -97,10 +222,16 @@ class EcoflowDataHolder:
             return
         self.status.update({"status": int(raw["params"]["status"])})
         self.status_time = dt.utcnow()
+        self.__notify_updated()
 
-    def update_data(self, raw: dict[str, Any]):
+    def update_data(
+        self,
+        raw: dict[str, Any],
+        payload: bytes | None = None,
+        decode: MessageDecoder | None = None,
+    ):
         if raw is not None:
-            self.__add_raw_data(raw)
+            self.__add_raw_data(raw, payload, decode)
             try:
                 if self.module_sn is not None:
                     if "moduleSn" not in raw:
@@ -108,12 +239,90 @@ class EcoflowDataHolder:
                     if raw["moduleSn"] != self.module_sn:
                         return
                 if "params" in raw:
-                    self.params.update(raw["params"])
+                    self.params_stale = False
+                    self.merge_params(raw["params"])
                     self.params_time = dt.utcnow()
+                    self.__notify_updated()
 
             except Exception as error:
                 _LOGGER.error("Error updating data: %s", error)
 
-    def __add_raw_data(self, raw: dict[str, Any]):
+    def write_data(
+        self,
+        write: Callable[[ParamWriter], bool],
+        payload: bytes | None = None,
+        decode: MessageDecoder | None = None,
+    ) -> bool:
+        """update_data() for a decoder writing straight into params.
+
+        write(set_param) passes every received value to set_param and returns
+        False if the message carried no params. No params dict is built, so
+        nothing is filtered by moduleSn: shared topics use update_data().
+        """
+        if self.__collect_raw and payload is not None and decode is not None:
+            # decoded into a message again only when diagnostics read it
+            self.raw_data.append_encoded(payload, decode)
+        try:
+            if not write(self.set_param):
+                return False
+        except Exception as error:
+            _LOGGER.error("Error updating data: %s", error)
+            return False
+        self.params_stale = False
+        self.params_time = dt.utcnow()
+        self.__notify_updated()
+        return True
+
+    def set_param(self, key: str, value: Any) -> bool:
+        # one received value, True if it changed params
+        params = self.params
+        current = params.get(key, MISSING)
+        if current is not MISSING and current == value:
+            return False
+        params[key] = value
+        with self.__changed_lock:
+            self.__changed_keys.add(key)
+            self.params_version += 1
+        return True
+
+    def restore_params(self, params: dict[str, Any]):
+        # last known params of the previous run, kept until fresh data arrives
+        self.params.update(params)
+        self.params_stale = True
+        self.__mark_changed(params.keys())
+
+    def merge_params(self, new_params: Mapping[str, Any]) -> list[str]:
+        # one pass over new_params, unchanged values are not written again;
+        # returns the keys that changed
+        params = self.params
+        changed = []
+        for key, value in new_params.items():
+            current = params.get(key, MISSING)
+            if current is not MISSING and current == value:
+                continue
+            params[key] = value
+            changed.append(key)
+        if changed:
+            self.__mark_changed(changed)
+        return changed
+
+    def __add_raw_data(
+        self,
+        raw: dict[str, Any],
+        payload: bytes | None,
+        decode: MessageDecoder | None,
+    ):
         if self.__collect_raw:
-            self.raw_data.append(raw)
+            _buffer(self.raw_data, raw, payload, decode)
+
+
+def _buffer(
+    buffer: BoundRingBuffer[dict[str, Any]],
+    msg: dict[str, Any],
+    payload: bytes | None,
+    decode: MessageDecoder | None,
+):
+    if payload is not None and decode is not None:
+        buffer.append_encoded(payload, decode)
+    else:
+        buffer.append(msg)
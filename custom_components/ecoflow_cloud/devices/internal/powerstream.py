@@ -1,6 +1,6 @@
 import logging
-from collections.abc import Sequence
-from typing import Any, cast, override
+from collections.abc import Hashable, Sequence
+from typing import Any, override
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.switch import SwitchEntity
@@ -12,13 +12,14 @@ from custom_components.ecoflow_cloud.devices import const
 from custom_components.ecoflow_cloud.select import PowerDictSelectEntity
 from custom_components.ecoflow_cloud.number import MaxBatteryLevelEntity, MinBatteryLevelEntity
 
-from ...devices import BaseDevice
+from ...device_data import DeviceData
+from ...devices import BaseDevice, EcoflowDeviceInfo
+from ...devices.data_holder import ParamWriter
 from ...devices.internal.proto.support import (
     to_lower_camel_case,
 )
 
 from ...api import EcoflowApiClient
-from ...api.message import JSONDict
 from ...sensor import (
     CelsiusSensorEntity,
     CentivoltSensorEntity,
@@ -42,11 +43,13 @@ from ...sensor import (
 from google.protobuf.message import Message as ProtoMessageRaw
 
 from ...switch import EnabledEntity
+from ..internal.proto import ecopacket_pb2 as ecopacket
 from ..internal.proto import platform_pb2 as platform
 from ..internal.proto import powerstream_pb2 as powerstream
 from ..internal.proto import AddressId, Command, ProtoMessage
 from .proto import PrivateAPIProtoDeviceMixin
-from .proto.support.const import WatthType, get_expected_payload_type
+from .proto.support.const import CommandFuncAndId, WatthType, get_expected_payload_type
+from .proto.support.decoder import params_decoder
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -64,6 +67,14 @@ def build_command(
 
 
 class PowerStream(PrivateAPIProtoDeviceMixin, BaseDevice):
+    def __init__(self, device_info: EcoflowDeviceInfo, device_data: DeviceData):
+        super().__init__(device_info, device_data)
+        self.__send_header_msg = ecopacket.SendHeaderMsg
+        heartbeat = Command.PRIVATE_API_POWERSTREAM_HEARTBEAT
+        self.__heartbeat_decoder = params_decoder(
+            get_expected_payload_type(heartbeat), f"{heartbeat.func}_{heartbeat.id}"
+        )
+
     @override
     def sensors(self, client: EcoflowApiClient) -> Sequence[SensorEntity]:
         return [
@@ -307,16 +318,45 @@ class PowerStream(PrivateAPIProtoDeviceMixin, BaseDevice):
             ),
         ]
 
+    @override
+    def coalesce_key(self, raw_data: bytes) -> Hashable | None:
+        # a heartbeat carries the complete inverter state, so only the newest
+        # pending one matters; energy reports and other packets are kept
+        packet = self.__send_header_msg()
+        _ = packet.ParseFromString(raw_data)
+        heartbeat = Command.PRIVATE_API_POWERSTREAM_HEARTBEAT
+        if not packet.msg or any(
+            message.cmd_func != heartbeat.func or message.cmd_id != heartbeat.id
+            for message in packet.msg
+        ):
+            return None
+        return (heartbeat.func, heartbeat.id)
+
     @override
     def _prepare_data(self, raw_data: bytes) -> dict[str, Any]:
-        res: dict[str, Any] = {"params": {}}
-        from google.protobuf.json_format import MessageToDict
+        params: dict[str, Any] = {}
+        res: dict[str, Any] = {"params": params}
+        command_desc = self.__decode(raw_data, params.__setitem__)
+        if command_desc is not None:
+            # Add cmd information to allow extraction in private_api_extract_quota_message
+            res["cmdFunc"] = command_desc.func
+            res["cmdId"] = command_desc.id
+            res["timestamp"] = dt.utcnow()
+        return res
 
-        from .proto import ecopacket_pb2 as ecopacket
-        from .proto.support.const import Command, CommandFuncAndId
+    @override
+    def _write_data(self, raw_data: bytes, set_param: ParamWriter) -> bool:
+        _ = self.__decode(raw_data, set_param)
+        return True
 
+    def __decode(
+        self, raw_data: bytes, set_param: ParamWriter
+    ) -> CommandFuncAndId | None:
+        # writes the params of every supported message, returns the command of
+        # the last one
+        last_command = None
         try:
-            packet = ecopacket.SendHeaderMsg()
+            packet = self.__send_header_msg()
             _ = packet.ParseFromString(raw_data)
             for message in packet.msg:
                 _LOGGER.debug(
@@ -350,17 +390,8 @@ class PowerStream(PrivateAPIProtoDeviceMixin, BaseDevice):
                     )
                     continue
 
-                params = cast(JSONDict, res.setdefault("params", {}))
                 if command in {Command.PRIVATE_API_POWERSTREAM_HEARTBEAT}:
-                    payload = get_expected_payload_type(command)()
-                    _ = payload.ParseFromString(message.pdata)
-                    params.update(
-                        (f"{command.func}_{command.id}.{key}", value)
-                        for key, value in cast(
-                            JSONDict,
-                            MessageToDict(payload, preserving_proto_field_name=False),
-                        ).items()
-                    )
+                    _ = self.__heartbeat_decoder.write(message.pdata, set_param)
                 elif command in {Command.PRIVATE_API_PLATFORM_WATTH}:
                     payload = platform.BatchEnergyTotalReport()
                     _ = payload.ParseFromString(message.pdata)
@@ -375,24 +406,20 @@ class PowerStream(PrivateAPIProtoDeviceMixin, BaseDevice):
                         field_name = (
                             f"watth{watth_type_name[0].upper()}{watth_type_name[1:]}"
                         )
-                        params.update(
-                            {
-                                f"{command.func}_{command.id}.{field_name}": sum(
-                                    watth_item.watth
-                                ),
-                                f"{command.func}_{command.id}.{field_name}Timestamp": watth_item.timestamp,
-                            }
+                        set_param(
+                            f"{command.func}_{command.id}.{field_name}",
+                            sum(watth_item.watth),
+                        )
+                        set_param(
+                            f"{command.func}_{command.id}.{field_name}Timestamp",
+                            watth_item.timestamp,
                         )
 
-                # Add cmd information to allow extraction in private_api_extract_quota_message
-                res["cmdFunc"] = command_desc.func
-                res["cmdId"] = command_desc.id
-                res["timestamp"] = dt.utcnow()
-                continue
+                last_command = command_desc
         except Exception as error:
             _LOGGER.error(error)
             _LOGGER.info(raw_data.hex())
-        return res
+        return last_command
 
     def _status_sensor(self, client: EcoflowApiClient) -> StatusSensorEntity:
         return QuotaStatusSensorEntity(client, self)
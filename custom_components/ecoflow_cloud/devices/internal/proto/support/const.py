@@ -4,6 +4,7 @@ from typing import NamedTuple, cast
 from google.protobuf.message import Message as ProtoMessageRaw
 
 from .. import platform_pb2 as platform
+from .. import powerstream_pb2 as powerstream
 
 
 # https://github.com/tomvd/local-powerstream/issues/4#issuecomment-2781354316
@@ -74,8 +75,6 @@ _expected_payload_types = dict[Command, type[ProtoMessageRaw]]()
 
 
 def get_expected_payload_type(cmd: Command) -> type[ProtoMessageRaw]:
-    from .. import powerstream_pb2 as powerstream
-
     global _expected_payload_types
     if not _expected_payload_types:
         _expected_payload_types.update(
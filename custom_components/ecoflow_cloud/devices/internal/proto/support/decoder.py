@@ -0,0 +1,79 @@
+import functools
+from collections.abc import Callable
+from typing import Any
+
+from google.protobuf.descriptor import FieldDescriptor
+from google.protobuf.json_format import MessageToDict
+from google.protobuf.message import Message as ProtoMessageRaw
+
+# field types whose python value is also their MessageToDict value; 64 bit ints
+# become strings, floats are rounded, enums and bytes are converted there
+_PLAIN_CPP_TYPES = frozenset(
+    {
+        FieldDescriptor.CPPTYPE_INT32,
+        FieldDescriptor.CPPTYPE_UINT32,
+        FieldDescriptor.CPPTYPE_BOOL,
+        FieldDescriptor.CPPTYPE_DOUBLE,
+        FieldDescriptor.CPPTYPE_STRING,
+    }
+)
+
+
+def _is_repeated(field: FieldDescriptor) -> bool:
+    # newer protobuf releases dropped label in favour of is_repeated
+    is_repeated = getattr(field, "is_repeated", None)
+    if is_repeated is not None:
+        return is_repeated
+    return field.label == FieldDescriptor.LABEL_REPEATED
+
+
+def _is_plain(field: FieldDescriptor) -> bool:
+    return (
+        not _is_repeated(field)
+        and field.cpp_type in _PLAIN_CPP_TYPES
+        and field.type != FieldDescriptor.TYPE_BYTES
+    )
+
+
+class ProtoParamsDecoder:
+    """Writes the set fields of a payload into params as "<prefix>.<jsonName>".
+
+    The same keys and values as MessageToDict(payload) with the prefix added,
+    from a field number -> key table built once per payload type. Payloads with
+    fields MessageToDict converts (64 bit ints, enums, nested...) still use it.
+    """
+
+    def __init__(self, message_class: type[ProtoMessageRaw], prefix: str):
+        self.__message_class = message_class
+        self.__prefix = prefix
+        fields = message_class.DESCRIPTOR.fields
+        self.__keys = {field.number: f"{prefix}.{field.json_name}" for field in fields}
+        self.__plain = all(_is_plain(field) for field in fields)
+
+    def decode(self, data: bytes, params: dict[str, Any]) -> int:
+        # returns the number of fields written
+        return self.write(data, params.__setitem__)
+
+    def write(self, data: bytes, set_param: Callable[[str, Any], Any]) -> int:
+        # decode() passing each value to set_param (EcoflowDataHolder.set_param)
+        payload = self.__message_class()
+        _ = payload.ParseFromString(data)
+        if not self.__plain:
+            values = MessageToDict(payload, preserving_proto_field_name=False)
+            prefix = self.__prefix
+            for key, value in values.items():
+                set_param(f"{prefix}.{key}", value)
+            return len(values)
+
+        keys = self.__keys
+        fields = payload.ListFields()
+        for field, value in fields:
+            set_param(keys[field.number], value)
+        return len(fields)
+
+
+@functools.cache
+def params_decoder(
+    message_class: type[ProtoMessageRaw], prefix: str
+) -> ProtoParamsDecoder:
+    return ProtoParamsDecoder(message_class, prefix)
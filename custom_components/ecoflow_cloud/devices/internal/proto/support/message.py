@@ -7,6 +7,7 @@ from paho.mqtt.client import PayloadType
 
 from .....api.message import JSONMessage, JSONType, Message
 from .....api.private_api import PrivateAPIMessageProtocol
+from .. import ecopacket_pb2 as ecopacket
 from .const import AddressId, Command, DirectionId, get_expected_payload_type
 
 _LOGGER = logging.getLogger(__name__)
@@ -51,8 +52,6 @@ class ProtoMessage(PrivateAPIMessageProtocol, Message):
             )
 
     def to_proto_message(self) -> ProtoMessageRaw:
-        from .. import ecopacket_pb2 as ecopacket
-
         packet = ecopacket.SendHeaderMsg()
         message = packet.msg.add()
 
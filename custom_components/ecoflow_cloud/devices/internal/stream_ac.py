@@ -1,5 +1,7 @@
 from custom_components.ecoflow_cloud.api import EcoflowApiClient
-from custom_components.ecoflow_cloud.devices import const, BaseDevice
+from custom_components.ecoflow_cloud.device_data import DeviceData
+from custom_components.ecoflow_cloud.devices import const, BaseDevice, EcoflowDeviceInfo
+from custom_components.ecoflow_cloud.devices.data_holder import ParamWriter
 from custom_components.ecoflow_cloud.entities import BaseSensorEntity, BaseNumberEntity, BaseSwitchEntity, \
     BaseSelectEntity
 from custom_components.ecoflow_cloud.sensor import WattsSensorEntity,LevelSensorEntity,CapacitySensorEntity, \
@@ -8,9 +10,36 @@ from custom_components.ecoflow_cloud.sensor import WattsSensorEntity,LevelSensor
 from homeassistant.util import utcnow
 import logging
 
+from .proto import stream_ac_pb2 as stream_ac
+
 _LOGGER = logging.getLogger(__name__)
 
+# cmd_id -> stream_ac_pb2 messages its pdata is decoded with (only the cmd_id is
+# known for these frames, not the cmd_func); other ids are tried with all of them
+_FRAME_MESSAGES = {
+    21: ("Champ_cmd21", "Champ_cmd21_3"),
+    50: ("Champ_cmd50", "Champ_cmd50_3"),
+}
+_ALL_FRAME_MESSAGES = (
+    "HeaderStream",
+    "Champ_cmd21",
+    "Champ_cmd21_3",
+    "Champ_cmd50",
+    "Champ_cmd50_3",
+)
+
 class StreamAC(BaseDevice):
+    def __init__(self, device_info: EcoflowDeviceInfo, device_data: DeviceData):
+        super().__init__(device_info, device_data)
+        self.__send_header_stream_msg = stream_ac.SendHeaderStreamMsg
+        self.__frame_messages = {
+            cmd_id: tuple(getattr(stream_ac, name) for name in names)
+            for cmd_id, names in _FRAME_MESSAGES.items()
+        }
+        self.__all_frame_messages = tuple(
+            getattr(stream_ac, name) for name in _ALL_FRAME_MESSAGES
+        )
+
     def sensors(self, client: EcoflowApiClient) -> list[BaseSensorEntity]:
         return [
             # "accuChgCap": 198511,
@@ -274,76 +303,74 @@ class StreamAC(BaseDevice):
 
     def _prepare_data(self, raw_data) -> dict[str, any]:
         raw = {"params": {}}
-        from .proto import ecopacket_pb2 as ecopacket, stream_ac_pb2 as stream_ac, stream_ac_pb2 as stream_ac2
+        if self.__decode(raw_data, raw["params"].__setitem__):
+            raw["timestamp"] = utcnow()
+        return raw
+
+    def _write_data(self, raw_data: bytes, set_param: ParamWriter) -> bool:
+        self.__decode(raw_data, set_param)
+        return True
+
+    def __decode(self, raw_data: bytes, set_param: ParamWriter) -> bool:
+        # writes the fields of every frame, False if no frame was decoded
+        decoded = False
+        debug = _LOGGER.isEnabledFor(logging.DEBUG)
         try:
-            payload =raw_data
+            # frames are cut from a view of the message, without copies
+            payload = memoryview(raw_data)
 
             while True:
-                _LOGGER.debug("payload \"%s\"", payload.hex())
-                packet = stream_ac.SendHeaderStreamMsg()
+                if debug:
+                    _LOGGER.debug("payload \"%s\"", payload.hex())
+                packet = self.__send_header_stream_msg()
                 packet.ParseFromString(payload)
+                cmd_id = packet.msg.cmd_id
+                pdata = packet.msg.pdata
 
-                if hasattr(packet.msg, "pdata") :
-                    _LOGGER.debug("cmd id \"%u\" fct id \"%u\" content \"%s\" - pdata:\"%s\"", packet.msg.cmd_id, packet.msg.cmd_func, str(packet), str(packet.msg.pdata.hex()))
-                else :
-                    _LOGGER.debug("cmd id \"%u\" fct id \"%u\" content \"%s\"", packet.msg.cmd_id, str(packet))
+                if debug:
+                    _LOGGER.debug("cmd id \"%u\" fct id \"%u\" content \"%s\" - pdata:\"%s\"", cmd_id, packet.msg.cmd_func, packet, pdata.hex())
 
-                if packet.msg.cmd_id < 0: #packet.msg.cmd_id != 21 and packet.msg.cmd_id != 22 and packet.msg.cmd_id != 50:
-                    _LOGGER.info("Unsupported EcoPacket cmd id %u", packet.msg.cmd_id)
+                if cmd_id < 0:
+                    _LOGGER.info("Unsupported EcoPacket cmd id %u", cmd_id)
 
                 else:
-                    _LOGGER.debug("new payload \"%s\"",str(packet.msg.pdata.hex()))
-                    # paquet HeaderStream
-                    if packet.msg.cmd_id > 0:
-                        self._parsedata(packet, stream_ac2.HeaderStream(), raw)
+                    fields = 0
+                    if cmd_id > 0 and len(pdata) > 0:
+                        messages = self.__frame_messages.get(cmd_id, self.__all_frame_messages)
+                        for message in messages:
+                            fields += self._parsedata(packet, pdata, message(), set_param, debug)
 
-                    # paquet Champ_cmd21
-                    if packet.msg.cmd_id > 0:
-                        self._parsedata(packet, stream_ac2.Champ_cmd21(), raw)
+                    _LOGGER.info("Found %u fields", fields)
 
-                    # paquet Champ_cmd21_3
-                    if packet.msg.cmd_id > 0:
-                        self._parsedata(packet, stream_ac2.Champ_cmd21_3(), raw)
+                    decoded = True
 
-                    # paquet Champ_cmd50
-                    if packet.msg.cmd_id > 0:
-                        self._parsedata(packet, stream_ac2.Champ_cmd50(), raw)
-
-                    # paquet Champ_cmd50_3
-                    if packet.msg.cmd_id > 0:
-                        self._parsedata(packet, stream_ac2.Champ_cmd50_3(), raw)
-
-                    _LOGGER.info("Found %u fields", len(raw["params"]))
-
-                    raw["timestamp"] = utcnow()
-
-                if packet.ByteSize() >= len(payload):
+                packet_size = packet.ByteSize()
+                if packet_size >= len(payload):
                     break
 
                 _LOGGER.info("Found another frame in payload")
 
-                packet_length = len(payload) - packet.ByteSize()
-                payload = payload[:packet_length]
+                payload = payload[:len(payload) - packet_size]
 
         except Exception as error:
             _LOGGER.error(error)
-            _LOGGER.debug("raw_data : \"%s\"  raw_data.hex() : \"%s\"",str(raw_data),str(raw_data.hex()))
-        return raw
+            _LOGGER.debug("raw_data : \"%s\"  raw_data.hex() : \"%s\"", raw_data, raw_data.hex())
+        return decoded
 
-    def _parsedata(self, packet, content, raw) :
+    def _parsedata(self, packet, pdata: bytes, content, set_param: ParamWriter, debug: bool) -> int:
+        # returns the number of fields written
         try:
-            if hasattr(packet.msg, "pdata") and len(packet.msg.pdata) > 0 :
-                content.ParseFromString(packet.msg.pdata)
-
-                if len(str(content)) > 0:
-                    _LOGGER.debug("initial cmd id \"%u\" fct id \"%u\" msg \n\"%s\"", packet.msg.cmd_id, packet.msg.cmd_func, str(content))
+            content.ParseFromString(pdata)
 
-                for descriptor in content.DESCRIPTOR.fields:
-                    if not content.HasField(descriptor.name):
-                        continue
+            if debug:
+                _LOGGER.debug("initial cmd id \"%u\" fct id \"%u\" msg \n\"%s\"", packet.msg.cmd_id, packet.msg.cmd_func, content)
 
-                    raw["params"][descriptor.name] = getattr(content, descriptor.name)
+            fields = content.ListFields()
+            for descriptor, value in fields:
+                set_param(descriptor.name, value)
+            return len(fields)
 
         except Exception as error:
             _LOGGER.debug(error)
-            _LOGGER.debug("Erreur parsing pour le flux : %s",str(packet.msg.pdata.hex()))
\ No newline at end of file
+            _LOGGER.debug("Erreur parsing pour le flux : %s", pdata.hex())
+            return 0
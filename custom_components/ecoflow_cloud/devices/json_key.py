@@ -0,0 +1,164 @@
+import functools
+import re
+from collections.abc import Callable
+from typing import Any
+
+import jsonpath_ng.ext as jp
+from jsonpath_ng.jsonpath import Child, Fields
+
+# returned by compiled getters when the key is not in the data
+MISSING: Any = object()
+
+_ID = re.compile(r"[a-zA-Z_][a-zA-Z0-9_@\-]*")
+_QUOTED = re.compile(r"'([^'\\]*)'")
+_INDEX = re.compile(r"\[(\d+)\]")
+# jsonpath reads "a.1" as field "1" of a
+_NUMBER = re.compile(r"\d+")
+# words the jsonpath lexer doesn't take as field names
+_RESERVED = {"where", "wherenot", "true", "false"}
+
+
+def _parse(key: str) -> tuple[str | int, ...] | None:
+    """Split the key syntax used by the devices into path segments.
+
+    Supports quoted fields ("'pd.soc'"), dotted fields ("a.b", "a.1") and list
+    indexes ("'wattInfo.chWatt'[0]", "'infoList'[0].chWatt"). None otherwise.
+    """
+    path: list[str | int] = []
+    pos = 0
+    expect_field = True
+    while pos < len(key):
+        if expect_field:
+            match = _QUOTED.match(key, pos)
+            if match:
+                path.append(match.group(1))
+            else:
+                match = _ID.match(key, pos)
+                if not match and path:
+                    match = _NUMBER.match(key, pos)
+                if not match or match.group(0) in _RESERVED:
+                    return None
+                path.append(match.group(0))
+            expect_field = False
+        elif key[pos] == ".":
+            pos += 1
+            expect_field = True
+            continue
+        else:
+            match = _INDEX.match(key, pos)
+            if not match:
+                return None
+            path.append(int(match.group(1)))
+        pos = match.end()
+    if expect_field:
+        return None
+    return tuple(path)
+
+
+def _jsonpath_getter(key: str) -> Callable[[Any], Any]:
+    expr = jp.parse(key)
+
+    def get(data: Any) -> Any:
+        values = expr.find(data)
+        return values[0].value if len(values) == 1 else MISSING
+
+    return get
+
+
+def _path_getter(path: tuple[str | int, ...]) -> Callable[[Any], Any]:
+    if len(path) == 1:
+        field = path[0]
+
+        def get_field(data: Any) -> Any:
+            return data.get(field, MISSING)
+
+        return get_field
+
+    def get_path(data: Any) -> Any:
+        value = data
+        for segment in path:
+            if type(segment) is int:
+                if not isinstance(value, list) or segment >= len(value):
+                    return MISSING
+            elif not isinstance(value, dict) or segment not in value:
+                return MISSING
+            value = value[segment]
+        return value
+
+    return get_path
+
+
+@functools.cache
+def compile_getter(key: str) -> Callable[[Any], Any]:
+    """Getter for a (json path) key: getter(params) -> value or MISSING.
+
+    Keys in the syntax the devices use become direct dict/list lookups, other
+    expressions are evaluated with jsonpath and must match exactly one value.
+    """
+    path = _parse(key)
+    if path is None:
+        return _jsonpath_getter(key)
+    return _path_getter(path)
+
+
+def _jsonpath_setter(key: str) -> Callable[[Any, Any], bool]:
+    expr = jp.parse(key)
+
+    def set_value(data: Any, value: Any) -> bool:
+        if not expr.find(data):
+            return False
+        expr.update(data, value)
+        return True
+
+    return set_value
+
+
+def _path_setter(path: tuple[str | int, ...]) -> Callable[[Any, Any], bool]:
+    get_parent = _path_getter(path[:-1]) if len(path) > 1 else None
+    last = path[-1]
+
+    def set_path(data: Any, value: Any) -> bool:
+        target = data if get_parent is None else get_parent(data)
+        if type(last) is int:
+            if not isinstance(target, list) or last >= len(target):
+                return False
+        elif not isinstance(target, dict) or last not in target:
+            return False
+        target[last] = value
+        return True
+
+    return set_path
+
+
+@functools.cache
+def compile_setter(key: str) -> Callable[[Any, Any], bool]:
+    """Setter for a (json path) key: setter(params, value) -> written.
+
+    Like jsonpath update() only existing values are replaced, nothing is
+    created; returns False if the key is not in the data.
+    """
+    path = _parse(key)
+    if path is None:
+        return _jsonpath_setter(key)
+    return _path_setter(path)
+
+
+@functools.cache
+def root_key(key: str) -> str | None:
+    """Top level params key a (json path) key reads from.
+
+    "'pd.soc'" -> "pd.soc", "'infoList'[0].chWatt" -> "infoList".
+    None if the expression does not start with a single field.
+    """
+    path = _parse(key)
+    if path is not None:
+        return path[0]
+    try:
+        node = jp.parse(key)
+    except Exception:
+        return None
+    while isinstance(node, Child):
+        node = node.left
+    if isinstance(node, Fields) and len(node.fields) == 1 and node.fields[0] != "*":
+        return node.fields[0]
+    return None
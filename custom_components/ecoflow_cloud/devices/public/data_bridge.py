@@ -1,4 +1,6 @@
 import logging
+from collections.abc import Callable, Sequence
+from typing import Any
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,39 +19,168 @@ plain_to_status: dict[str, str] = {
 status_to_plain = dict((v, k) for (k, v) in plain_to_status.items())
 
 
-def to_plain(raw_data: dict[str, any]) -> dict[str, any]:
-    new_params = {}
-    prefix = ""
-    if "typeCode" in raw_data:
-        prefix1 = status_to_plain.get(
-            raw_data["typeCode"], "unknown_" + raw_data["typeCode"]
-        )
-        prefix += f"{prefix1}."
-    elif "cmdFunc" in raw_data and "cmdId" in raw_data:
-        prefix += f"{raw_data['cmdFunc']}_{raw_data['cmdId']}."
-    else :
-        prefix += ""
-
-    if "param" in raw_data:
-        for k, v in raw_data["param"].items():
-            new_params[f"{prefix}{k}"] = v
-
-    if "params" in raw_data:
-        for k, v in raw_data["params"].items():
-            new_params[f"{prefix}{k}"] = v
-
-    for k, v in raw_data.items():
-        if k != "param" and k != "params":
-            new_params[f"{prefix}{k}"] = v
-
-    new_params2 = {}
-    for k, v in new_params.items():
-        new_params2[k] = v
-        if isinstance(v, dict):
-            for k2, v2 in v.items():
-                new_params2[f"{k}.{k2}"] = v2
-
-    result = {"params": new_params2, "raw_data": raw_data}
-    _LOGGER.debug(str(result))
-
-    return result
\ No newline at end of file
+# message fields a key prefix can come from, see PlainFlattener
+PREFIX_TYPE_CODE = "typeCode"
+PREFIX_ADDR = "addr"
+PREFIX_CMD = "cmd"
+
+
+class PlainFlattener:
+    """Flattens a nested public API message into {"params": {...}} in one pass.
+
+    The keys of "param" and "params" and the other top level keys get a prefix
+    from the first of prefix_by the message has: its typeCode (mapped by
+    status_to_plain), addr or cmdFunc_cmdId. Nested dicts are expanded down to
+    depth levels (None: all) as "key.sub", the dict itself is kept unless
+    leaves_only, which also expands lists as "key.0". With params_only the other
+    top level keys stay where they are and messages without a prefix are
+    returned unchanged. Prefix strings are built once per typeCode/addr/cmd.
+    The containers are read in the order given, a key of a later one replaces
+    the same key of an earlier one. write() passes the params to a callable
+    (EcoflowDataHolder.set_param) instead of building the result.
+    """
+
+    def __init__(
+        self,
+        prefix_by: Sequence[str] = (PREFIX_TYPE_CODE, PREFIX_CMD),
+        depth: int | None = 1,
+        leaves_only: bool = False,
+        params_only: bool = False,
+        containers: Sequence[str] = ("param", "params"),
+    ):
+        self.__prefix_by = tuple(prefix_by)
+        self.__param_containers = tuple(containers)
+        self.__depth = depth
+        self.__leaves_only = leaves_only
+        self.__params_only = params_only
+        # values __put() expands
+        self.__containers = (dict, list) if leaves_only else (dict,)
+        self.__prefixes: dict[tuple[str, Any], str] = {}
+
+    def __prefix(self, raw_data: dict[str, Any]) -> str | None:
+        for source in self.__prefix_by:
+            if source == PREFIX_CMD:
+                if "cmdFunc" not in raw_data or "cmdId" not in raw_data:
+                    continue
+                value = (raw_data["cmdFunc"], raw_data["cmdId"])
+            elif source in raw_data:
+                value = raw_data[source]
+            else:
+                continue
+            key = (source, value)
+            prefix = self.__prefixes.get(key)
+            if prefix is None:
+                if source == PREFIX_CMD:
+                    prefix = f"{value[0]}_{value[1]}."
+                elif source == PREFIX_TYPE_CODE:
+                    prefix = f"{status_to_plain.get(value, f'unknown_{value}')}."
+                else:
+                    prefix = f"{value}."
+                self.__prefixes[key] = prefix
+            return prefix
+        return None
+
+    def flatten(
+        self, raw_data: dict[str, Any], keep_raw: bool = False
+    ) -> dict[str, Any]:
+        # keep_raw adds the message under "raw_data", for diagnostics
+        prefix = self.__prefix(raw_data)
+        if prefix is None:
+            if self.__params_only:
+                return raw_data
+            prefix = ""
+
+        params: dict[str, Any] = {}
+        result: dict[str, Any] = {"params": params}
+        self.__write(raw_data, prefix, params.__setitem__, result)
+        if keep_raw:
+            result["raw_data"] = raw_data
+        _LOGGER.debug("%s", result)
+        return result
+
+    def write(
+        self, raw_data: dict[str, Any], set_param: Callable[[str, Any], Any]
+    ) -> bool:
+        # the params of flatten(raw_data) to set_param, False if it has none
+        prefix = self.__prefix(raw_data)
+        if prefix is None:
+            if self.__params_only:
+                if "params" not in raw_data:
+                    return False
+                for key, value in raw_data["params"].items():
+                    set_param(key, value)
+                return True
+            prefix = ""
+
+        self.__write(raw_data, prefix, set_param, None)
+        return True
+
+    def __write(
+        self,
+        raw_data: dict[str, Any],
+        prefix: str,
+        set_param: Callable[[str, Any], Any],
+        result: dict[str, Any] | None,
+    ):
+        # result: where params_only puts the other top level keys
+        depth = self.__depth
+        containers = self.__containers
+        params_only = self.__params_only
+        for container in self.__param_containers:
+            if container in raw_data:
+                for key, value in raw_data[container].items():
+                    if prefix:
+                        key = f"{prefix}{key}"
+                    if isinstance(value, containers):
+                        self.__put(set_param, key, value, depth)
+                    else:
+                        set_param(key, value)
+        for key, value in raw_data.items():
+            if key == "param" or key == "params":
+                continue
+            if params_only:
+                if result is not None:
+                    result[key] = value
+                continue
+            if prefix:
+                key = f"{prefix}{key}"
+            if isinstance(value, containers):
+                self.__put(set_param, key, value, depth)
+            else:
+                set_param(key, value)
+
+    def __put(
+        self,
+        set_param: Callable[[str, Any], Any],
+        key: str,
+        value: Any,
+        depth: int | None,
+    ):
+        if depth == 0:
+            set_param(key, value)
+        elif isinstance(value, dict):
+            if not self.__leaves_only:
+                set_param(key, value)
+            depth = None if depth is None else depth - 1
+            for sub_key, sub_value in value.items():
+                self.__put(set_param, f"{key}.{sub_key}", sub_value, depth)
+        elif isinstance(value, list) and self.__leaves_only:
+            depth = None if depth is None else depth - 1
+            for index, item in enumerate(value):
+                self.__put(set_param, f"{key}.{index}", item, depth)
+        else:
+            set_param(key, value)
+
+
+_plain = PlainFlattener()
+
+
+def to_plain(raw_data: dict[str, Any], keep_raw: bool = False) -> dict[str, Any]:
+    return _plain.flatten(raw_data, keep_raw)
+
+
+def write_plain(
+    raw_data: dict[str, Any], set_param: Callable[[str, Any], Any]
+) -> bool:
+    # the params of to_plain(raw_data) to set_param
+    return _plain.write(raw_data, set_param)
@@ -1,16 +1,20 @@
 from ...api import EcoflowApiClient
 from ...sensor import StatusSensorEntity
 from ..internal.delta2_max import Delta2Max as InternalDelta2Max
-from .data_bridge import to_plain
+from ..data_holder import ParamWriter
+from .data_bridge import to_plain, write_plain
 
 
 class Delta2Max(InternalDelta2Max):
 
     def _prepare_data(self, raw_data) -> dict[str, any]:
         res = super()._prepare_data(raw_data)
-        res = to_plain(res)
+        res = to_plain(res, self.device_data.options.diagnostic_mode)
         return res
 
+    def _write_data(self, raw_data: bytes, set_param: ParamWriter) -> bool:
+        return write_plain(super()._prepare_data(raw_data), set_param)
+
     def _status_sensor(self, client: EcoflowApiClient) -> StatusSensorEntity:
         return StatusSensorEntity(client, self)
 
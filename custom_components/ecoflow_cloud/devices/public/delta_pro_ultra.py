@@ -24,6 +24,20 @@ from ...sensor import (
 from ...switch import EnabledEntity
 from .. import BaseDevice, const
 
+# every nested value to a top level key: prefix.a.0, prefix.a.1.b
+_flattener = data_bridge.PlainFlattener(
+    prefix_by=(
+        data_bridge.PREFIX_TYPE_CODE,
+        data_bridge.PREFIX_ADDR,
+        data_bridge.PREFIX_CMD,
+    ),
+    depth=None,
+    leaves_only=True,
+    params_only=True,
+    # "params" first, a key also in "param" keeps the value from there
+    containers=("params", "param"),
+)
+
 
 class DeltaProUltra(BaseDevice):
 
@@ -157,7 +171,7 @@ class DeltaProUltra(BaseDevice):
 
     def _prepare_data(self, raw_data) -> dict[str, any]:
         res = super()._prepare_data(raw_data)
-        res = self.to_plain_nested_addr_prefix(res)
+        res = _flattener.flatten(res)
 
         # split showFlag into separate keys for each bit using documentation's bit ordering
         if "hs_yj751_pd_appshow_addr.showFlag" in res["params"] and isinstance(res["params"]["hs_yj751_pd_appshow_addr.showFlag"], int):
@@ -165,44 +179,4 @@ class DeltaProUltra(BaseDevice):
             for x in range(16):
                 res["params"][f"hs_yj751_pd_appshow_addr.showFlag.{x+1}"] = (documentation_bit_order >> x) & 1
         return res
-
-
-    def to_plain_nested_addr_prefix(self, raw_data: dict[str, any]) -> dict[str, any]:
-        if "typeCode" in raw_data:
-            prefix = data_bridge.status_to_plain.get(raw_data["typeCode"], "unknown_"+raw_data["typeCode"])
-        elif "addr" in raw_data:
-            prefix = raw_data['addr']
-        elif "cmdFunc" in raw_data and "cmdId" in raw_data:
-            prefix = f"{raw_data['cmdFunc']}_{raw_data['cmdId']}"
-        else:
-            # Used for quota/all responses
-            return raw_data
-    
-        new_params = {}
-        if "params" in raw_data:
-            self.nested_to_top_level(new_params, prefix, raw_data["params"])
-        if "param" in raw_data:
-            self.nested_to_top_level(new_params, prefix, raw_data["param"])
-    
-        result = {"params": new_params}
-        for (k, v) in raw_data.items():
-            if k != "param" and k != "params":
-                result[k] = v
-        return result
-    
-    
-    def nested_to_top_level(self, dest, k, v):
-        """Converts each nested dict/list value to a top-level key of
-           the prefix followed by dot notation path to the value.
-           ex.
-               {"a": [123, {"b": 456}]} -> {"a.0": 123, "a.1.b": 456}
-        """
-        if isinstance(v, dict):
-            for (kk, vv) in v.items():
-                self.nested_to_top_level(dest, f"{k}.{kk}", vv)
-        elif isinstance(v, list):
-            for ii, vv in enumerate(v):
-                self.nested_to_top_level(dest, f"{k}.{ii}", vv)
-        else:
-            dest[k] = v
   
@@ -31,7 +31,8 @@ from ...sensor import (
     StatusSensorEntity,
 )
 from .. import BaseDevice, const
-from .data_bridge import to_plain
+from ..data_holder import ParamWriter
+from .data_bridge import to_plain, write_plain
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -268,8 +269,12 @@ class PowerStream(BaseDevice):
     @override
     def _prepare_data(self, raw_data: bytes) -> dict[str, Any]:
         res = super()._prepare_data(raw_data)
-        res = to_plain(res)
+        res = to_plain(res, self.device_data.options.diagnostic_mode)
         return res
 
+    @override
+    def _write_data(self, raw_data: bytes, set_param: ParamWriter) -> bool:
+        return write_plain(super()._prepare_data(raw_data), set_param)
+
     def _status_sensor(self, client: EcoflowApiClient) -> StatusSensorEntity:
         return StatusSensorEntity(client, self)
@@ -1,4 +1,5 @@
-from .data_bridge import to_plain
+from ..data_holder import ParamWriter
+from .data_bridge import to_plain, write_plain
 from ..internal.river2_max import River2Max as InternalRiver2Max
 from ...api import EcoflowApiClient
 from ...sensor import StatusSensorEntity
@@ -7,8 +8,11 @@ from ...sensor import StatusSensorEntity
 class River2Max(InternalRiver2Max):
     def _prepare_data(self, raw_data) -> dict[str, any]:
         res = super()._prepare_data(raw_data)
-        res = to_plain(res)
+        res = to_plain(res, self.device_data.options.diagnostic_mode)
         return res
 
+    def _write_data(self, raw_data: bytes, set_param: ParamWriter) -> bool:
+        return write_plain(super()._prepare_data(raw_data), set_param)
+
     def _status_sensor(self, client: EcoflowApiClient) -> StatusSensorEntity:
         return StatusSensorEntity(client, self)
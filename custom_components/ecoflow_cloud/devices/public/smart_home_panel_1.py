@@ -2,7 +2,7 @@ from custom_components.ecoflow_cloud.select import DictSelectEntity
 from custom_components.ecoflow_cloud.switch import EnabledEntity
 from custom_components.ecoflow_cloud.button import EnabledButtonEntity
 
-import jsonpath_ng.ext as jp
+from ..json_key import MISSING, compile_getter
 from datetime import datetime
 
 from ...api import EcoflowApiClient
@@ -26,6 +26,8 @@ from ...sensor import (
     QuotaScheduledStatusSensorEntity,
 )
 from .. import BaseDevice, const
+from ..data_holder import ParamWriter
+from .data_bridge import PlainFlattener
 
 # SHP MQTT command constants (cmdSet 11)
 CMD_SET_SHP = 11
@@ -41,6 +43,9 @@ CMD_ID_SELF_CHECK = 112
 CMD_SET_SYS = 1
 CMD_ID_RESET = 20
 
+# SHP payloads are nested and carry no typeCode/cmd prefix
+_flattener = PlainFlattener(prefix_by=())
+
 
 class CircuitModeSelectEntity(DictSelectEntity):
     """Select for Circuit Mode using ctrlMode/ctrlSta combo.
@@ -63,8 +68,8 @@ class CircuitModeSelectEntity(DictSelectEntity):
         options = {"Auto": 0, "Grid": 0, "Battery": 1, "Off": 2}
         super().__init__(client, device, key, title, options, command=None)
 
-        # jsonpath for ctrlMode
-        self._ctrl_mode_expr = jp.parse(
+        # getter for ctrlMode
+        self._ctrl_mode_getter = compile_getter(
             self._adopt_json_key(f"'heartbeat.loadCmdChCtrlInfos'[{ch_index}].ctrlMode")
         )
 
@@ -72,8 +77,9 @@ class CircuitModeSelectEntity(DictSelectEntity):
         # Compute option based on ctrlMode and ctrlSta
         try:
             params = self._device.data.params
-            mode_vals = self._ctrl_mode_expr.find(params)
-            ctrl_mode = mode_vals[0].value if len(mode_vals) == 1 else None
+            ctrl_mode = self._ctrl_mode_getter(params)
+            if ctrl_mode is MISSING:
+                ctrl_mode = None
             if ctrl_mode == 0:
                 self._current_option = "Auto"
                 return True
@@ -533,33 +539,12 @@ class SmartHomePanel1(BaseDevice):
         return False
 
     def _prepare_data(self, raw_data) -> dict[str, any]:
-        # Mirror SHP2 data preparation: merge param/params and flatten dicts one level
+        # merge param/params and flatten dicts one level: keys like 'heartbeat.gridSta'
         res = super()._prepare_data(raw_data)
-        new_params: dict[str, any] = {}
-
-        # Merge nested content from 'param' and 'params' if present
-        if "param" in res:
-            for k, v in res["param"].items():
-                new_params[k] = v
-
-        if "params" in res:
-            for k, v in res["params"].items():
-                new_params[k] = v
-
-        # Optionally include other top-level keys (excluding the containers) for completeness
-        for k, v in res.items():
-            if k not in ("param", "params"):
-                new_params[k] = v
-
-        # Shallow-flatten dicts one level: produce keys like 'heartbeat.gridSta'
-        new_params2: dict[str, any] = {}
-        for k, v in new_params.items():
-            new_params2[k] = v
-            if isinstance(v, dict):
-                for k2, v2 in v.items():
-                    new_params2[f"{k}.{k2}"] = v2
-
-        return {"params": new_params2, "raw_data": res}
+        return _flattener.flatten(res, self.device_data.options.diagnostic_mode)
+
+    def _write_data(self, raw_data: bytes, set_param: ParamWriter) -> bool:
+        return _flattener.write(super()._prepare_data(raw_data), set_param)
 
 
 # Device-local configuration entity: sets scheduled quota refresh interval (seconds)
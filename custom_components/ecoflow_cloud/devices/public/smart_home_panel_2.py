@@ -17,6 +17,10 @@ from ...sensor import (
     WattsSensorEntity,
 )
 from .. import BaseDevice, const
+from ..data_holder import ParamWriter
+from .data_bridge import PlainFlattener
+
+_flattener = PlainFlattener(prefix_by=())
 
 class SmartHomePanel2(BaseDevice):
 
@@ -178,26 +182,9 @@ class SmartHomePanel2(BaseDevice):
         return False
 
     def _prepare_data(self, raw_data) -> dict[str, any]:
+        # merge param/params and flatten dicts one level: keys like 'wattInfo.gridWatt'
         res = super()._prepare_data(raw_data)
-        new_params = {}
-
-        if "param" in res:
-            for k, v in res["param"].items():
-                new_params[f"{k}"] = v
-
-        if "params" in res:
-            for k, v in res["params"].items():
-                new_params[f"{k}"] = v
-
-        for k, v in res.items():
-            if k != "param" and k != "params":
-                new_params[f"{k}"] = v
-
-        new_params2 = {}
-        for k, v in new_params.items():
-            new_params2[k] = v
-            if isinstance(v, dict):
-                for k2, v2 in v.items():
-                    new_params2[f"{k}.{k2}"] = v2
+        return _flattener.flatten(res, self.device_data.options.diagnostic_mode)
 
-        return {"params": new_params2, "raw_data": res}
+    def _write_data(self, raw_data: bytes, set_param: ParamWriter) -> bool:
+        return _flattener.write(super()._prepare_data(raw_data), set_param)
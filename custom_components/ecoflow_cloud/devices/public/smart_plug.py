@@ -13,7 +13,8 @@ from ...sensor import (
 )
 from ...switch import EnabledEntity
 from .. import BaseDevice, const
-from .data_bridge import to_plain
+from ..data_holder import ParamWriter
+from .data_bridge import to_plain, write_plain
 
 
 class SmartPlug(BaseDevice):
@@ -64,6 +65,9 @@ class SmartPlug(BaseDevice):
 
     def _prepare_data(self, raw_data) -> dict[str, any]:
         res = super()._prepare_data(raw_data)
-        res = to_plain(res)
+        res = to_plain(res, self.device_data.options.diagnostic_mode)
 
         return res
+
+    def _write_data(self, raw_data: bytes, set_param: ParamWriter) -> bool:
+        return write_plain(super()._prepare_data(raw_data), set_param)
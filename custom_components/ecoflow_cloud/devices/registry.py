@@ -1,99 +1,101 @@
+import importlib
+from collections.abc import Iterable, Iterator, Mapping
 from typing import Type, OrderedDict
 
-from .internal import (
-    delta2 as internal_delta2,
-    delta3 as internal_delta3,
-    river2 as internal_river2,
-    river2_max as internal_river2_max,
-    river2_pro as internal_river2_pro,
-    delta2_max as internal_delta2_max,
-    delta_pro as internal_delta_pro,
-    river_max as internal_river_max,
-    river_pro as internal_river_pro,
-    river_mini as internal_river_mini,
-    delta_mini as internal_delta_mini,
-    delta_max as internal_delta_max,
-    powerstream as internal_powerstream,
-    glacier as internal_glacier,
-    wave2 as internal_wave2,
-    smart_meter as internal_smart_meter,
-    stream_ac as internal_stream_ac,
-)
-from .public import (
-    delta_pro as public_delta_pro,
-    delta_pro_ultra as public_delta_pro_ultra,
-    delta2 as public_delta2,
-    delta2_max as public_delta2_max,
-    delta3 as public_delta3,
-    river2 as public_river2,
-    river2_max as public_river2_max,
-    river2_pro as public_river2_pro,
-    smart_plug as public_smart_plug,
-    delta_max as public_delta_max,
-    powerstream as public_powerstream,
-    delta_pro_3 as public_delta_pro_3,
-    powerkit as public_powerkit,
-    smart_meter as public_smart_meter,
-    stream_ac as public_stream_ac,
-    stream_microinverter as public_stream_microinverter,
-    wave2 as public_wave2,
-    smart_home_panel_1 as public_smart_home_panel_1,
-    smart_home_panel_2 as public_smart_home_panel_2,
-)
-from ..devices import BaseDevice, DiagnosticDevice
+from ..devices import BaseDevice
+
+
+class LazyDeviceRegistry(Mapping[str, Type[BaseDevice]]):
+    """Device type -> device class, importing a device module on first access.
+
+    Listing the types (keys, in) imports nothing. Lookups import in the
+    calling thread; on the event loop call preload() in the executor first.
+    A device module imports what it decodes with (protobuf modules...), so
+    that is loaded there as well.
+    """
+
+    def __init__(self, classes: dict[str, str]):
+        # type -> "module:Class", module relative to this package
+        self.__classes = OrderedDict[str, str](classes)
+        self.__loaded: dict[str, Type[BaseDevice]] = {}
+
+    def __getitem__(self, device_type: str) -> Type[BaseDevice]:
+        device_class = self.__loaded.get(device_type)
+        if device_class is None:
+            module_name, class_name = self.__classes[device_type].split(":")
+            module = importlib.import_module(module_name, __package__)
+            device_class = self.__loaded[device_type] = getattr(module, class_name)
+        return device_class
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__classes)
+
+    def __len__(self) -> int:
+        return len(self.__classes)
+
+    def __reversed__(self) -> Iterator[str]:
+        # Mapping sets __reversed__ to None, the types keep their listing order
+        return reversed(self.__classes)
+
+    def __contains__(self, device_type: object) -> bool:
+        return device_type in self.__classes
+
+    def preload(self, device_types: Iterable[str]):
+        for device_type in device_types:
+            if device_type in self.__classes:
+                _ = self[device_type]
+
 
-devices: OrderedDict[str, Type[BaseDevice]] = OrderedDict[str, Type[BaseDevice]](
+devices = LazyDeviceRegistry(
     {
-        "DELTA_2": internal_delta2.Delta2,
-        "DELTA_3": internal_delta3.Delta3,
-        "RIVER_2": internal_river2.River2,
-        "RIVER_2_MAX": internal_river2_max.River2Max,
-        "RIVER_2_PRO": internal_river2_pro.River2Pro,
-        "DELTA_PRO": internal_delta_pro.DeltaPro,
-        "RIVER_MAX": internal_river_max.RiverMax,
-        "RIVER_PRO": internal_river_pro.RiverPro,
-        "RIVER_MINI": internal_river_mini.RiverMini,
-        "DELTA_MINI": internal_delta_mini.DeltaMini,
-        "DELTA_MAX": internal_delta_max.DeltaMax,
-        "DELTA_2_MAX": internal_delta2_max.Delta2Max,
-        "POWERSTREAM": internal_powerstream.PowerStream,
-        "GLACIER": internal_glacier.Glacier,
-        "WAVE_2": internal_wave2.Wave2,
-        "SMART_METER": internal_smart_meter.SmartMeter,
-        "STREAM_AC": internal_stream_ac.StreamAC,
-        "STREAM_PRO": internal_stream_ac.StreamAC,
-        "STREAM_ULTRA": internal_stream_ac.StreamAC,
-        "DIAGNOSTIC": DiagnosticDevice,
+        "DELTA_2": ".internal.delta2:Delta2",
+        "DELTA_3": ".internal.delta3:Delta3",
+        "RIVER_2": ".internal.river2:River2",
+        "RIVER_2_MAX": ".internal.river2_max:River2Max",
+        "RIVER_2_PRO": ".internal.river2_pro:River2Pro",
+        "DELTA_PRO": ".internal.delta_pro:DeltaPro",
+        "RIVER_MAX": ".internal.river_max:RiverMax",
+        "RIVER_PRO": ".internal.river_pro:RiverPro",
+        "RIVER_MINI": ".internal.river_mini:RiverMini",
+        "DELTA_MINI": ".internal.delta_mini:DeltaMini",
+        "DELTA_MAX": ".internal.delta_max:DeltaMax",
+        "DELTA_2_MAX": ".internal.delta2_max:Delta2Max",
+        "POWERSTREAM": ".internal.powerstream:PowerStream",
+        "GLACIER": ".internal.glacier:Glacier",
+        "WAVE_2": ".internal.wave2:Wave2",
+        "SMART_METER": ".internal.smart_meter:SmartMeter",
+        "STREAM_AC": ".internal.stream_ac:StreamAC",
+        "STREAM_PRO": ".internal.stream_ac:StreamAC",
+        "STREAM_ULTRA": ".internal.stream_ac:StreamAC",
+        "DIAGNOSTIC": ".:DiagnosticDevice",
     }
 )
 
-device_by_product: OrderedDict[str, Type[BaseDevice]] = OrderedDict[
-    str, Type[BaseDevice]
-](
+device_by_product = LazyDeviceRegistry(
     {
-        "DELTA Max": public_delta_max.DeltaMax,
-        "DELTA Pro": public_delta_pro.DeltaPro,
-        "DELTA Pro Ultra": public_delta_pro_ultra.DeltaProUltra,
-        "DELTA 2": public_delta2.Delta2,
-        "DELTA 2 Max": public_delta2_max.Delta2Max,
-        "DELTA 3": public_delta3.Delta3,
-        "RIVER 2": public_river2.River2,
-        "RIVER 2 Max": public_river2_max.River2Max,
-        "RIVER 2 Pro": public_river2_pro.River2Pro,
-        "Smart Plug": public_smart_plug.SmartPlug,
-        "PowerStream": public_powerstream.PowerStream,
-        "WAVE 2": public_wave2.Wave2,
-        "Delta Pro 3": public_delta_pro_3.DeltaPro3,
-        "Power Kits": public_powerkit.PowerKit,
-        "Smart Meter": public_smart_meter.SmartMeter,
-        "Stream AC": public_stream_ac.StreamAC,
-        "Stream PRO": public_stream_ac.StreamAC,
-        "Stream Ultra": public_stream_ac.StreamAC,
-        "Stream Microinverter" : public_stream_microinverter.StreamMicroinveter,
-        "Smart Home Panel": public_smart_home_panel_1.SmartHomePanel1,
-        "Smart Home Panel 1": public_smart_home_panel_1.SmartHomePanel1,
-        "Smart Home Panel 2": public_smart_home_panel_2.SmartHomePanel2,
-        "Diagnostic": DiagnosticDevice,
+        "DELTA Max": ".public.delta_max:DeltaMax",
+        "DELTA Pro": ".public.delta_pro:DeltaPro",
+        "DELTA Pro Ultra": ".public.delta_pro_ultra:DeltaProUltra",
+        "DELTA 2": ".public.delta2:Delta2",
+        "DELTA 2 Max": ".public.delta2_max:Delta2Max",
+        "DELTA 3": ".public.delta3:Delta3",
+        "RIVER 2": ".public.river2:River2",
+        "RIVER 2 Max": ".public.river2_max:River2Max",
+        "RIVER 2 Pro": ".public.river2_pro:River2Pro",
+        "Smart Plug": ".public.smart_plug:SmartPlug",
+        "PowerStream": ".public.powerstream:PowerStream",
+        "WAVE 2": ".public.wave2:Wave2",
+        "Delta Pro 3": ".public.delta_pro_3:DeltaPro3",
+        "Power Kits": ".public.powerkit:PowerKit",
+        "Smart Meter": ".public.smart_meter:SmartMeter",
+        "Stream AC": ".public.stream_ac:StreamAC",
+        "Stream PRO": ".public.stream_ac:StreamAC",
+        "Stream Ultra": ".public.stream_ac:StreamAC",
+        "Stream Microinverter": ".public.stream_microinverter:StreamMicroinveter",
+        "Smart Home Panel": ".public.smart_home_panel_1:SmartHomePanel1",
+        "Smart Home Panel 1": ".public.smart_home_panel_1:SmartHomePanel1",
+        "Smart Home Panel 2": ".public.smart_home_panel_2:SmartHomePanel2",
+        "Diagnostic": ".:DiagnosticDevice",
     }
 )
 
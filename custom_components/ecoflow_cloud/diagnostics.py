@@ -29,7 +29,15 @@ async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigE
             'set_reply': [dict(sorted(k.items())) for k in device.data.set_reply],
             'get':       [dict(sorted(k.items())) for k in device.data.get],
             'get_reply': [dict(sorted(k.items())) for k in device.data.get_reply],
-            'raw_data': device.data.raw_data,
+            'raw_data': list(device.data.raw_data),
         }
         values["EcoFlow"].append(value)
+    values["ingest"] = client.ingest.stats()
+    values["mqtt_reconnect"] = client.reconnect_supervisor.stats()
+    values["http"] = client.http.stats()
+    values["quota"] = client.quota_flight.stats()
+    values["rest_circuit"] = client.breaker_stats()
+    scheduler = getattr(client, "scheduler", None)
+    if scheduler is not None:
+        values["rest_scheduler"] = scheduler.stats()
     return values
@@ -3,7 +3,6 @@ from __future__ import annotations
 import inspect
 from typing import Any, Callable, Mapping, OrderedDict, cast
 
-import jsonpath_ng.ext as jp
 from homeassistant.components.button import ButtonEntity
 from homeassistant.components.number import NumberEntity
 from homeassistant.components.select import SelectEntity
@@ -18,6 +17,7 @@ from ..devices import (
     BaseDevice,
     EcoflowDeviceUpdateCoordinator,
 )
+from ..devices.json_key import MISSING, compile_getter, root_key
 
 
 class EcoFlowAbstractEntity(CoordinatorEntity[EcoflowDeviceUpdateCoordinator]):
@@ -78,17 +78,22 @@ class EcoFlowDictEntity(EcoFlowAbstractEntity):
 
         self.__mqtt_key = mqtt_key
         self._mqtt_key_adopted = self._adopt_json_key(mqtt_key)
-        self._mqtt_key_expr = jp.parse(self._mqtt_key_adopted)
+        self._mqtt_key_getter = compile_getter(self._mqtt_key_adopted)
 
         self._auto_enable = auto_enable
         self._attr_entity_registry_enabled_default = enabled
         self._attr_entity_registry_visible_default = enabled
         self._attr_available = enabled
         self.__attributes_mapping: dict[str, str] = {}
+        self.__attr_getters: dict[str, tuple[str, Callable[[Any], Any]]] = {}
         self.__attrs = OrderedDict[str, Any]()
 
     def attr(self, mqtt_key: str, title: str, default: Any) -> EcoFlowDictEntity:
         self.__attributes_mapping[mqtt_key] = title
+        self.__attr_getters[mqtt_key] = (
+            title,
+            compile_getter(self._adopt_json_key(mqtt_key)),
+        )
         self.__attrs[title] = default
         return self
 
@@ -112,30 +117,45 @@ class EcoFlowDictEntity(EcoFlowAbstractEntity):
 
     async def async_added_to_hass(self):
         await super().async_added_to_hass()
-        # d = self._device.data.params_observable().subscribe(self._updated)
-        # self.async_on_remove(d.dispose)
+        self.async_on_remove(
+            self.coordinator.async_add_key_listener(self._data_keys(), self._updated)
+        )
+
+    def _data_keys(self) -> set[str] | None:
+        # top level params keys _updated reads, None if it can't be told
+        keys = set[str]()
+        for key in [
+            self._mqtt_key_adopted,
+            *(self._adopt_json_key(k) for k in self.__attributes_mapping),
+        ]:
+            root = root_key(key)
+            if root is None:
+                return None
+            keys.add(root)
+        return keys
 
     def _handle_coordinator_update(self) -> None:
-        if self.coordinator.data.changed:
-            self._updated(self.coordinator.data.data_holder.params)
+        # values are delivered by the coordinator's key index, see async_added_to_hass
+        pass
 
     def _updated(self, data: dict[str, Any]):
         # update attributes
-        for key, title in self.__attributes_mapping.items():
-            key_expr = jp.parse(self._adopt_json_key(key))
-            attr_values = key_expr.find(data)
-            if len(attr_values) == 1:
-                self.__attrs[title] = attr_values[0].value
+        attrs_changed = False
+        for title, getter in self.__attr_getters.values():
+            attr_value = getter(data)
+            if attr_value is not MISSING and self.__attrs[title] != attr_value:
+                self.__attrs[title] = attr_value
+                attrs_changed = True
 
         # update value
-        values = self._mqtt_key_expr.find(data)
-        if len(values) == 1:
+        value = self._mqtt_key_getter(data)
+        if value is not MISSING:
             self._attr_available = True
             if self._auto_enable:
                 self._attr_entity_registry_enabled_default = True
                 self._attr_entity_registry_visible_default = True
 
-            if self._update_value(values[0].value):
+            if self._update_value(value) or attrs_changed:
                 self.schedule_update_ha_state()
 
     @property
@@ -184,6 +204,9 @@ class EcoFlowBaseCommandEntity[_CommandArg](EcoFlowDictEntity):
         self._client.send_set_message(
             self._device.device_info.sn, {self._mqtt_key_adopted: target_value}, command
         )
+        # show the target value right away, other entities bound to the key
+        # follow with the next broadcast
+        self._updated(self._device.data.params)
 
 
 class BaseNumberEntity(NumberEntity, EcoFlowBaseCommandEntity[int]):
@@ -31,9 +31,11 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.util import dt
 
 from . import (
+    ATTR_API_CIRCUIT,
     ATTR_MQTT_CONNECTED,
     ATTR_QUOTA_REQUESTS,
     ATTR_STATUS_DATA_LAST_UPDATE,
+    ATTR_STATUS_DATA_STALE,
     ATTR_STATUS_PHASE,
     ATTR_STATUS_RECONNECTS,
     ATTR_STATUS_SN,
@@ -466,8 +468,18 @@ class StatusSensorEntity(SensorEntity, EcoFlowAbstractEntity):
         self._attrs = OrderedDict[str, Any]()
         self._attrs[ATTR_STATUS_SN] = self._device.device_info.sn
         self._attrs[ATTR_STATUS_DATA_LAST_UPDATE] = None
+        self._attrs[ATTR_STATUS_DATA_STALE] = self._device.data.params_stale
         self._attrs[ATTR_MQTT_CONNECTED] = None
 
+    async def async_added_to_hass(self):
+        await super().async_added_to_hass()
+        # counts the watchdog ticks without data to assume the device offline
+        self.async_on_remove(
+            self.coordinator.async_add_watchdog_listener(
+                self._handle_coordinator_update
+            )
+        )
+
     def _handle_coordinator_update(self) -> None:
         changed = False
         update_time = self.coordinator.data.data_holder.last_received_time()
@@ -476,8 +488,11 @@ class StatusSensorEntity(SensorEntity, EcoFlowAbstractEntity):
             self._skip_count = 0
             self._actualize_attributes()
             changed = True
-        else:
+        elif self.coordinator.data.watchdog:
             self._skip_count += 1
+        else:
+            # pushed for a local change (target state), nothing was received
+            return
 
         changed = self._actualize_status() or changed
 
@@ -516,6 +531,7 @@ class StatusSensorEntity(SensorEntity, EcoFlowAbstractEntity):
         else:
             self._attrs[ATTR_STATUS_DATA_LAST_UPDATE] = self._last_update
 
+        self._attrs[ATTR_STATUS_DATA_STALE] = self._device.data.params_stale
         self._attrs[ATTR_MQTT_CONNECTED] = self._client.mqtt_client.is_connected()
 
     @property
@@ -535,9 +551,14 @@ class QuotaStatusSensorEntity(StatusSensorEntity):
     ):
         super().__init__(client, device, title, key)
         self._attrs[ATTR_QUOTA_REQUESTS] = 0
+        self._attrs[ATTR_API_CIRCUIT] = None
 
     def _actualize_status(self) -> bool:
         changed = False
+        circuit = self._client.circuit_state()
+        if self._attrs[ATTR_API_CIRCUIT] != circuit:
+            self._attrs[ATTR_API_CIRCUIT] = circuit
+            changed = True
         if (
             self._online != _OnlineStatus.ASSUME_OFFLINE
             and self._skip_count >= self._offline_skip_count * 2
@@ -607,10 +628,10 @@ class ReconnectStatusSensorEntity(StatusSensorEntity):
         time_to_reconnect = self._skip_count in self.CONNECT_PHASES
 
         if self._online == _OnlineStatus.ONLINE and time_to_reconnect:
-            self._attrs[ATTR_STATUS_RECONNECTS] = (
-                self._attrs[ATTR_STATUS_RECONNECTS] + 1
-            )
-            self._client.mqtt_client.reconnect()
+            if self._client.request_reconnect():
+                self._attrs[ATTR_STATUS_RECONNECTS] = (
+                    self._attrs[ATTR_STATUS_RECONNECTS] + 1
+                )
             return True
         else:
             return super()._actualize_status()
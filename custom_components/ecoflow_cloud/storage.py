@@ -0,0 +1,117 @@
+import json
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt
+
+from . import ECOFLOW_DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+CREDENTIALS_STORAGE_VERSION = 1
+SNAPSHOT_STORAGE_VERSION = 1
+# the snapshot is also written on unload, this only limits the loss on a crash
+SNAPSHOT_SAVE_DELAY_SEC = 900
+
+
+class EcoflowCredentialsStore:
+    """Last MQTT credentials (and API session) of a config entry.
+
+    Lets a restart connect to the broker before the REST login is done.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self.__store = Store[dict[str, Any]](
+            hass,
+            CREDENTIALS_STORAGE_VERSION,
+            f"{ECOFLOW_DOMAIN}.credentials.{entry_id}",
+            private=True,
+        )
+
+    async def async_load(self) -> dict[str, Any] | None:
+        try:
+            return await self.__store.async_load()
+        except Exception as error:
+            _LOGGER.warning("Ignoring stored credentials: %s", error)
+            return None
+
+    async def async_save(self, credentials: dict[str, Any]):
+        await self.__store.async_save(credentials)
+
+    async def async_remove(self):
+        await self.__store.async_remove()
+
+
+class EcoflowSnapshotStore:
+    """Last known params of the devices of a config entry.
+
+    Restored on setup so entities have values before the first message of a
+    device arrives. Saved with a delay while data comes in and on unload.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self.__store = Store[dict[str, Any]](
+            hass, SNAPSHOT_STORAGE_VERSION, f"{ECOFLOW_DOMAIN}.snapshot.{entry_id}"
+        )
+        self.__devices: dict[str, Any] = {}
+        self.__loaded: dict[str, dict[str, Any]] = {}
+        self.__save_pending = False
+
+    async def async_load(self) -> dict[str, dict[str, Any]]:
+        # sn -> {"params": {...}, "time": <utc timestamp>}
+        try:
+            self.__loaded = await self.__store.async_load() or {}
+        except Exception as error:
+            _LOGGER.warning("Ignoring stored device snapshot: %s", error)
+            self.__loaded = {}
+        return self.__loaded
+
+    @callback
+    def async_schedule_save(self, devices: dict[str, Any]):
+        self.__devices = devices
+        # async_delay_save restarts its timer on every call, with a steady flow of
+        # updates it would never write
+        if not self.__save_pending:
+            self.__save_pending = True
+            self.__store.async_delay_save(self.__snapshot, SNAPSHOT_SAVE_DELAY_SEC)
+
+    async def async_save(self, devices: dict[str, Any]):
+        self.__devices = devices
+        await self.__store.async_save(self.__snapshot())
+
+    async def async_remove(self):
+        await self.__store.async_remove()
+
+    def __snapshot(self) -> dict[str, dict[str, Any]]:
+        self.__save_pending = False
+        snapshot = {}
+        for sn, device in self.__devices.items():
+            holder = device.data
+            if holder is None or not holder.params:
+                continue
+            # params keep changing on the ingest workers while the file is written
+            params = _serializable_params(sn, dict(holder.params))
+            if holder.params_stale:
+                # nothing new from the device, keep the time of the restored data
+                params_time = self.__loaded.get(sn, {}).get("time", 0)
+            else:
+                params_time = dt.as_timestamp(holder.params_time)
+            snapshot[sn] = {"params": params, "time": params_time}
+        return snapshot
+
+
+def _serializable_params(sn: str, params: dict[str, Any]) -> dict[str, Any]:
+    # a copy that is known to serialize, without the values that do not
+    try:
+        return json.loads(json.dumps(params))
+    except (TypeError, ValueError):
+        pass
+    result = {}
+    for key, value in params.items():
+        try:
+            result[key] = json.loads(json.dumps(value))
+        except (TypeError, ValueError) as error:
+            _LOGGER.debug("Leaving %s of %s out of the snapshot: %s", key, sn, error)
+    return result
@@ -0,0 +1,95 @@
+"""Import time of the device registry with one device vs every device class.
+
+Each case runs in a fresh python -X importtime interpreter, after the Home
+Assistant modules BaseDevice depends on were imported untimed:
+  - registry: importing devices/registry.py
+  - one device: the registry and the class of a single DELTA_2
+  - all devices: the registry and every device class
+
+Lookups of the lazy registry import with importlib.import_module, which
+-X importtime does not report. So each case is timed as a whole, and the
+modules it added to sys.modules are counted. The -X importtime column is the
+cumulative time of the registry import statement alone.
+
+The modules are imported from the tree given on the command line (the
+repository by default), so a commit can be compared with its parent:
+
+    git worktree add /tmp/before <commit>^
+    git worktree add /tmp/after <commit>
+    python scripts/bench_import_time.py /tmp/before
+    python scripts/bench_import_time.py /tmp/after
+
+Needs the integration's requirements (Home Assistant) to be installed.
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.abspath(
+    sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "..")
+)
+PACKAGE = "custom_components.ecoflow_cloud"
+REGISTRY = f"{PACKAGE}.devices.registry"
+RUNS = 5
+CASES = {
+    "registry": f"import {REGISTRY}",
+    "one device": f"from {REGISTRY} import devices\ndevices['DELTA_2']",
+    "all devices": (
+        f"from {REGISTRY} import devices, device_by_product\n"
+        "for registry in (devices, device_by_product):\n"
+        "    for device_type in registry:\n"
+        "        registry[device_type]"
+    ),
+}
+_TIMED = """\
+import sys, time
+import homeassistant.components.button, homeassistant.components.number
+import homeassistant.components.select, homeassistant.components.sensor
+import homeassistant.components.switch, homeassistant.helpers.update_coordinator
+before = set(sys.modules)
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+added = set(sys.modules) - before
+own = [name for name in added if name.startswith("{package}")]
+print(elapsed * 1000, len(added), len(own))
+"""
+_REGISTRY_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| " + re.escape(REGISTRY) + "$")
+
+
+def measure(code: str) -> tuple[float, int, int, float]:
+    # (ms, modules, integration modules, registry -X importtime ms)
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            _TIMED.format(package=PACKAGE, code=code),
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed, modules, own = result.stdout.split()
+    importtime = 0
+    for line in result.stderr.splitlines():
+        match = _REGISTRY_LINE.match(line)
+        if match is not None:
+            importtime = int(match.group(1))
+    return float(elapsed), int(modules), int(own), importtime / 1000
+
+
+def main():
+    print(f"{ROOT} (best of {RUNS})")
+    print("case              ms   modules   ecoflow_cloud   registry -X importtime ms")
+    for name, code in CASES.items():
+        total, modules, own, importtime = min(measure(code) for _ in range(RUNS))
+        print(f"{name:12s} {total:7.1f} {modules:9d} {own:15d} {importtime:25.1f}")
+
+
+if __name__ == "__main__":
+    main()
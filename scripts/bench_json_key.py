@@ -0,0 +1,125 @@
+"""Compiled entity key getters vs jsonpath lookups, over the real device keys.
+
+Collects the keys of the entities in devices/internal and devices/public,
+builds params holding every key and compares jsonpath find() with
+json_key.compile_getter(), for the values and the time per key.
+
+    python scripts/bench_json_key.py
+
+json_key only needs jsonpath-ng, it is loaded from its file so that Home
+Assistant does not have to be installed.
+"""
+
+import ast
+import glob
+import importlib.util
+import os
+import timeit
+
+import jsonpath_ng.ext as jp
+
+DEVICES = os.path.join(
+    os.path.dirname(__file__), "..", "custom_components", "ecoflow_cloud", "devices"
+)
+# devices whose keys are paths, the others quote them, see _adopt_json_key
+NESTED_KEYS = {"powerkit.py", "smart_home_panel_1.py", "smart_home_panel_2.py"}
+
+
+def load_json_key():
+    spec = importlib.util.spec_from_file_location(
+        "json_key", os.path.join(DEVICES, "json_key.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def keys_of(path: str) -> list[str]:
+    # entity constructors take (client, device, key, title, ...)
+    keys = []
+    with open(path) as file:
+        tree = ast.parse(file.read())
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        if len(node.args) >= 4:
+            arg = node.args[2]
+            if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                keys.append(arg.value)
+            elif isinstance(arg, ast.JoinedStr):
+                keys.append(
+                    "".join(
+                        v.value if isinstance(v, ast.Constant) else "0"
+                        for v in arg.values
+                    )
+                )
+        if isinstance(node.func, ast.Attribute) and node.func.attr == "attr":
+            if node.args and isinstance(node.args[0], ast.Constant):
+                if isinstance(node.args[0].value, str):
+                    keys.append(node.args[0].value)
+    return keys
+
+
+def device_keys() -> list[str]:
+    keys = []
+    paths = glob.glob(os.path.join(DEVICES, "internal", "*.py"))
+    paths += glob.glob(os.path.join(DEVICES, "public", "*.py"))
+    for path in sorted(paths):
+        quote = os.path.basename(path) not in NESTED_KEYS
+        for key in keys_of(path):
+            key = f"'{key}'" if quote else key
+            try:
+                jp.parse(key)
+            except Exception:
+                continue
+            keys.append(key)
+    return list(dict.fromkeys(keys))
+
+
+def per_key_us(func, keys: list[str], number: int) -> float:
+    return timeit.timeit(func, number=number) / number / len(keys) * 1e6
+
+
+def main():
+    json_key = load_json_key()
+    keys = device_keys()
+
+    params = {}
+    for i, key in enumerate(keys):
+        try:
+            jp.parse(key).update_or_create(params, i)
+        except Exception:
+            pass
+
+    expressions = [jp.parse(key) for key in keys]
+    getters = [json_key.compile_getter(key) for key in keys]
+
+    mismatches = 0
+    for key, expression, getter in zip(keys, expressions, getters):
+        found = expression.find(params)
+        expected = found[0].value if len(found) == 1 else json_key.MISSING
+        if getter(params) != expected:
+            mismatches += 1
+            print(f"mismatch: {key}")
+
+    compiled = sum(1 for key in keys if json_key._parse(key) is not None)
+    print(f"keys: {len(keys)}, compiled without jsonpath: {compiled}")
+    print(f"values different from jsonpath find(): {mismatches}")
+
+    find = per_key_us(lambda: [e.find(params) for e in expressions], keys, 20)
+    get = per_key_us(lambda: [g(params) for g in getters], keys, 20)
+    print(f"lookup us/key: jsonpath find {find:.2f}, compiled {get:.3f}")
+
+    parse = per_key_us(lambda: [jp.parse(key) for key in keys], keys, 2)
+
+    def compile_all():
+        json_key.compile_getter.cache_clear()
+        for key in keys:
+            json_key.compile_getter(key)
+
+    compile_time = per_key_us(compile_all, keys, 2)
+    print(f"setup us/key: jp.parse {parse:.1f}, compile_getter {compile_time:.2f}")
+
+
+if __name__ == "__main__":
+    main()
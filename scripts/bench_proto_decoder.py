@@ -0,0 +1,89 @@
+"""Decode cost of a PowerStream heartbeat: MessageToDict vs ProtoParamsDecoder.
+
+The heartbeat is rebuilt from the "20_1.*" values in diag/powerstream.json
+(diagnostics keep params, not frames). Both paths parse the frame and write
+the "20_1.<jsonName>" params into a dict:
+  - MessageToDict: what PowerStream did before, converting the payload and
+    rebuilding every key
+  - ProtoParamsDecoder: the field number -> key table
+  - ProtoParamsDecoder.write: the same, into EcoflowDataHolder.set_param
+
+    python scripts/bench_proto_decoder.py
+
+Needs the integration's requirements (Home Assistant) to be installed.
+"""
+
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from google.protobuf.json_format import MessageToDict  # noqa: E402
+
+from custom_components.ecoflow_cloud.devices.data_holder import (  # noqa: E402
+    EcoflowDataHolder,
+)
+from custom_components.ecoflow_cloud.devices.internal.proto.support.const import (  # noqa: E402
+    Command,
+    get_expected_payload_type,
+)
+from custom_components.ecoflow_cloud.devices.internal.proto.support.decoder import (  # noqa: E402
+    ProtoParamsDecoder,
+)
+
+RUNS = 20000
+HEARTBEAT = Command.PRIVATE_API_POWERSTREAM_HEARTBEAT
+PREFIX = f"{HEARTBEAT.func}_{HEARTBEAT.id}"
+
+
+def diag_heartbeat() -> bytes:
+    heartbeat_class = get_expected_payload_type(HEARTBEAT)
+    fields = {field.json_name: field.name for field in heartbeat_class.DESCRIPTOR.fields}
+    with open(os.path.join(ROOT, "diag", "powerstream.json")) as diag:
+        params = json.load(diag)["data"]["params"]
+    values = {}
+    for key, value in params.items():
+        name = fields.get(key[len(PREFIX) + 1 :])
+        if key.startswith(f"{PREFIX}.") and name is not None:
+            values[name] = value
+    return heartbeat_class(**values).SerializeToString()
+
+
+def main():
+    frame = diag_heartbeat()
+    heartbeat_class = get_expected_payload_type(HEARTBEAT)
+    decoder = ProtoParamsDecoder(heartbeat_class, PREFIX)
+    holder = EcoflowDataHolder(lambda message: message)
+
+    def message_to_dict():
+        payload = heartbeat_class()
+        payload.ParseFromString(frame)
+        params = {}
+        params.update(
+            (f"{PREFIX}.{key}", value)
+            for key, value in MessageToDict(
+                payload, preserving_proto_field_name=False
+            ).items()
+        )
+
+    def decode():
+        decoder.decode(frame, {})
+
+    def write():
+        decoder.write(frame, holder.set_param)
+
+    print(f"heartbeat: {len(heartbeat_class.FromString(frame).ListFields())} fields")
+    for name, run in (
+        ("MessageToDict", message_to_dict),
+        ("ProtoParamsDecoder.decode", decode),
+        ("ProtoParamsDecoder.write", write),
+    ):
+        elapsed = min(timeit.repeat(run, number=RUNS, repeat=3)) / RUNS * 1e6
+        print(f"{name:26s} {elapsed:7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Per message dispatch cost of the MQTT client, as a function of the device count.
+
+Before EcoflowTopicRouter the client offered each message to every device,
+whose update_data compared the topic with its topic strings. The router looks
+the topic up in one table, so its cost should stay flat as the number of
+devices grows.
+
+The dispatch code is imported from the tree given on the command line (the
+repository by default), so a commit can be compared with its parent:
+
+    git worktree add /tmp/before <commit>^
+    git worktree add /tmp/after <commit>
+    python scripts/bench_topic_router.py /tmp/before
+    python scripts/bench_topic_router.py /tmp/after
+
+Trees without api/topic_router.py are measured with the former offer loop.
+Devices are DiagnosticDevices that do not decode anything, and whose data
+holder ignores the message. Needs the integration's requirements (Home
+Assistant) to be installed.
+"""
+
+import os
+import sys
+import timeit
+
+ROOT = os.path.abspath(
+    sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "..")
+)
+sys.path.insert(0, ROOT)
+
+from custom_components.ecoflow_cloud.device_data import (  # noqa: E402
+    DeviceData,
+    DeviceOptions,
+)
+from custom_components.ecoflow_cloud.devices import (  # noqa: E402
+    DiagnosticDevice,
+    EcoflowDeviceInfo,
+)
+
+try:
+    from custom_components.ecoflow_cloud.api.topic_router import (  # noqa: E402
+        EcoflowTopicRouter,
+    )
+except ImportError:
+    EcoflowTopicRouter = None
+
+MESSAGES = 20000
+
+
+class _IgnoredHolder:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class StubDevice(DiagnosticDevice):
+    def __init__(self, sn: str):
+        base = f"/open/user/{sn}"
+        super().__init__(
+            EcoflowDeviceInfo(
+                public_api=True,
+                sn=sn,
+                name=sn,
+                device_type="STUB",
+                status=1,
+                data_topic=f"{base}/quota",
+                set_topic=f"{base}/set",
+                set_reply_topic=f"{base}/set_reply",
+                get_topic=None,
+                get_reply_topic=None,
+                status_topic=f"{base}/status",
+            ),
+            DeviceData(sn, sn, "STUB", DeviceOptions(60, -1, False), None, None),
+        )
+        self.data = _IgnoredHolder()
+
+    def _prepare_data(self, raw_data: bytes):
+        return {}
+
+
+def dispatcher(devices: list[StubDevice]):
+    if EcoflowTopicRouter is None:
+        by_sn = {device.device_info.sn: device for device in devices}
+
+        def on_message(topic: str, payload: bytes):
+            # EcoflowMQTTClient._on_message before the router
+            for sn, device in by_sn.items():
+                device.update_data(payload, topic)
+
+        return on_message
+
+    router = EcoflowTopicRouter()
+    for device in devices:
+        router.add_device(device)
+    return router.route
+
+
+def main():
+    mode = "offer loop" if EcoflowTopicRouter is None else "router"
+    print(f"{ROOT}: {mode}")
+    print("devices   us/message")
+    for count in (1, 10, 60, 200):
+        devices = [StubDevice(f"SN{i:04d}") for i in range(count)]
+        dispatch = dispatcher(devices)
+        # the last device, the offer loop has to compare with all of them
+        topic = devices[-1].device_info.status_topic
+        elapsed = timeit.timeit(lambda: dispatch(topic, b""), number=MESSAGES)
+        print(f"{count:7d} {elapsed / MESSAGES * 1e6:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.ecoflow_cloud.devices import (  # noqa: E402
+    EcoflowBroadcastDataHolder,
+    EcoflowDeviceUpdateCoordinator,
+)
+from custom_components.ecoflow_cloud.devices.data_holder import (  # noqa: E402
+    EcoflowDataHolder,
+)
+
+
+def _notified(tmp_path, changed: bool, watchdog: bool) -> list[str]:
+    # listeners called for one broadcast, in order
+    async def run() -> list[str]:
+        holder = EcoflowDataHolder(lambda message: message)
+        coordinator = EcoflowDeviceUpdateCoordinator(
+            HomeAssistant(str(tmp_path)), holder, 60, None
+        )
+        calls = []
+        remove_entity = coordinator.async_add_listener(lambda: calls.append("entity"))
+        coordinator.async_add_watchdog_listener(lambda: calls.append("watchdog"))
+        coordinator.data = EcoflowBroadcastDataHolder(holder, changed, set(), watchdog)
+        coordinator.async_update_listeners()
+        remove_entity()
+        return calls
+
+    return asyncio.run(run())
+
+
+def test_watchdog_tick_without_changes_only_notifies_watchdog_listeners(tmp_path):
+    assert _notified(tmp_path, changed=False, watchdog=True) == ["watchdog"]
+
+
+def test_watchdog_tick_with_changes_notifies_every_listener(tmp_path):
+    assert _notified(tmp_path, changed=True, watchdog=True) == ["entity"]
+
+
+def test_pushed_update_notifies_every_listener(tmp_path):
+    assert _notified(tmp_path, changed=False, watchdog=False) == ["entity"]
@@ -0,0 +1,69 @@
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.ecoflow_cloud.devices.public import data_bridge  # noqa: E402
+from custom_components.ecoflow_cloud.devices.public.delta_pro_ultra import (  # noqa: E402
+    _flattener as delta_pro_ultra_flattener,
+)
+
+
+def test_to_plain_params_replace_param():
+    raw = {"typeCode": "pdStatus", "param": {"a": 1, "b": 2}, "params": {"a": 3}}
+
+    params = data_bridge.to_plain(raw)["params"]
+
+    assert params == {"pd.a": 3, "pd.b": 2, "pd.typeCode": "pdStatus"}
+    assert list(params) == ["pd.a", "pd.b", "pd.typeCode"]
+
+
+def test_delta_pro_ultra_param_replaces_params():
+    raw = {
+        "addr": "hs_yj751_pd_appshow_addr",
+        "param": {"a": 1, "b": [4]},
+        "params": {"a": 2, "c": {"d": 3}},
+        "cmdId": 1,
+    }
+
+    result = delta_pro_ultra_flattener.flatten(raw)
+
+    assert result == {
+        "params": {
+            "hs_yj751_pd_appshow_addr.a": 1,
+            "hs_yj751_pd_appshow_addr.c.d": 3,
+            "hs_yj751_pd_appshow_addr.b.0": 4,
+        },
+        "addr": "hs_yj751_pd_appshow_addr",
+        "cmdId": 1,
+    }
+    assert list(result["params"]) == [
+        "hs_yj751_pd_appshow_addr.a",
+        "hs_yj751_pd_appshow_addr.c.d",
+        "hs_yj751_pd_appshow_addr.b.0",
+    ]
+
+
+def test_containers_order_is_configurable():
+    raw = {"param": {"a": 1}, "params": {"a": 2}}
+
+    first = data_bridge.PlainFlattener(prefix_by=(), containers=("params", "param"))
+    last = data_bridge.PlainFlattener(prefix_by=(), containers=("param", "params"))
+
+    assert first.flatten(raw)["params"] == {"a": 1}
+    assert last.flatten(raw)["params"] == {"a": 2}
+
+
+def test_write_passes_the_flattened_params():
+    raw = {
+        "typeCode": "pdStatus",
+        "param": {"a": 1, "b": {"c": 2}},
+        "params": {"a": 3},
+        "ts": 4,
+    }
+    written = {}
+
+    assert data_bridge.write_plain(raw, written.__setitem__)
+
+    params = data_bridge.to_plain(raw)["params"]
+    assert written == params
+    assert list(written) == list(params)
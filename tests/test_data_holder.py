@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.ecoflow_cloud.devices.data_holder import (  # noqa: E402
+    EcoflowDataHolder,
+)
+
+
+def _holder() -> EcoflowDataHolder:
+    return EcoflowDataHolder(lambda message: message)
+
+
+def test_set_param_returns_whether_the_value_changed():
+    holder = _holder()
+
+    assert holder.set_param("a", 1)
+    assert not holder.set_param("a", 1)
+    assert holder.set_param("a", 2)
+    assert holder.set_param("b", None)
+    assert not holder.set_param("b", None)
+
+    assert holder.params == {"a": 2, "b": None}
+    assert holder.pop_changed_keys() == {"a", "b"}
+    assert holder.pop_changed_keys() == set()
+
+
+def test_write_data_marks_only_changed_keys():
+    holder = _holder()
+    holder.restore_params({"a": 1, "b": 2})
+    holder.pop_changed_keys()
+    updates = []
+    holder.set_update_listener(lambda: updates.append(True))
+
+    def write(set_param):
+        set_param("a", 1)
+        set_param("b", 3)
+        set_param("c", 4)
+        return True
+
+    assert holder.write_data(write)
+
+    assert holder.params == {"a": 1, "b": 3, "c": 4}
+    assert holder.pop_changed_keys() == {"b", "c"}
+    assert not holder.params_stale
+    assert updates == [True]
+
+
+def test_write_data_without_params():
+    holder = _holder()
+    updates = []
+    holder.set_update_listener(lambda: updates.append(True))
+
+    assert not holder.write_data(lambda set_param: False)
+
+    assert holder.params == {}
+    assert updates == []
@@ -0,0 +1,88 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from google.protobuf.json_format import MessageToDict  # noqa: E402
+from google.protobuf.message import Message  # noqa: E402
+
+from custom_components.ecoflow_cloud.devices.internal.proto import (  # noqa: E402
+    powerstream_pb2 as powerstream,
+)
+from custom_components.ecoflow_cloud.devices.internal.proto.support.const import (  # noqa: E402
+    Command,
+    get_expected_payload_type,
+)
+from custom_components.ecoflow_cloud.devices.internal.proto.support.decoder import (  # noqa: E402
+    ProtoParamsDecoder,
+)
+
+HEARTBEAT = Command.PRIVATE_API_POWERSTREAM_HEARTBEAT
+PREFIX = f"{HEARTBEAT.func}_{HEARTBEAT.id}"
+DIAG = Path(__file__).parents[1] / "diag" / "powerstream.json"
+
+
+def _message_to_dict(payload: Message, prefix: str) -> dict[str, Any]:
+    # what PowerStream did before ProtoParamsDecoder
+    return {
+        f"{prefix}.{key}": value
+        for key, value in MessageToDict(payload, preserving_proto_field_name=False).items()
+    }
+
+
+def _diag_heartbeats() -> list[Message]:
+    # diagnostics keep decoded params, not frames: rebuild heartbeats from the
+    # values of the fields the current InverterHeartbeat still has
+    heartbeat_class = get_expected_payload_type(HEARTBEAT)
+    fields = {field.json_name: field.name for field in heartbeat_class.DESCRIPTOR.fields}
+    params = json.loads(DIAG.read_text())["data"]["params"]
+    values = {
+        fields[key[len(PREFIX) + 1 :]]: value
+        for key, value in params.items()
+        if key.startswith(f"{PREFIX}.") and key[len(PREFIX) + 1 :] in fields
+    }
+    assert values
+
+    full = heartbeat_class(**values)
+    zeros = heartbeat_class(**{name: type(value)() for name, value in values.items()})
+    partial = heartbeat_class(**dict(list(values.items())[:5]))
+    return [full, zeros, partial, heartbeat_class()]
+
+
+@pytest.mark.parametrize("heartbeat", _diag_heartbeats())
+def test_heartbeat_params_match_message_to_dict(heartbeat: Message):
+    decoder = ProtoParamsDecoder(type(heartbeat), PREFIX)
+    params: dict[str, Any] = {}
+
+    written = decoder.decode(heartbeat.SerializeToString(), params)
+
+    expected = _message_to_dict(heartbeat, PREFIX)
+    assert params == expected
+    assert written == len(expected)
+
+
+def test_diag_heartbeat_values_are_decoded_unchanged():
+    heartbeat = _diag_heartbeats()[0]
+    params: dict[str, Any] = {}
+
+    ProtoParamsDecoder(type(heartbeat), PREFIX).decode(
+        heartbeat.SerializeToString(), params
+    )
+
+    diag = json.loads(DIAG.read_text())["data"]["params"]
+    assert params == {key: diag[key] for key in params}
+
+
+def test_converted_fields_still_use_message_to_dict():
+    node = powerstream.NodeMassage(sn="HW51", mac=b"\x01\x02")
+    params: dict[str, Any] = {}
+
+    ProtoParamsDecoder(powerstream.NodeMassage, "1_2").decode(
+        node.SerializeToString(), params
+    )
+
+    assert params == _message_to_dict(node, "1_2")
+    assert params["1_2.mac"] == "AQI="
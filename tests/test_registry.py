@@ -0,0 +1,25 @@
+import pytest
+
+pytest.importorskip("homeassistant")
+pytest.importorskip("aiohttp")
+
+from custom_components.ecoflow_cloud.api.public_api import (  # noqa: E402
+    _product_by_device_name,
+)
+from custom_components.ecoflow_cloud.devices.registry import (  # noqa: E402
+    LazyDeviceRegistry,
+    device_by_product,
+)
+
+
+def test_registry_reversed_keeps_listing_order():
+    registry = LazyDeviceRegistry({"A": ".x:A", "B": ".x:B", "C": ".x:C"})
+    assert list(reversed(registry)) == ["C", "B", "A"]
+
+
+def test_product_by_device_name_without_product_name():
+    # /device/list entries without productName are matched by their deviceName
+    assert list(reversed(device_by_product)) == list(device_by_product)[::-1]
+    assert _product_by_device_name("DELTA Pro Ultra-1234") == "DELTA Pro Ultra"
+    assert _product_by_device_name("Smart Home Panel 2 garage") == "Smart Home Panel 2"
+    assert _product_by_device_name("unknown-device") is None
@@ -0,0 +1,53 @@
+import asyncio
+import types
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.ecoflow_cloud.api import EcoflowApiClient  # noqa: E402
+from custom_components.ecoflow_cloud.api.resilience import (  # noqa: E402
+    BreakerState,
+    CircuitBreaker,
+)
+
+HOST = "api.example.com"
+
+
+def _half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=1, reset_sec=0)
+    breaker.record_failure()
+    assert breaker.state == BreakerState.HALF_OPEN
+    return breaker
+
+
+def test_only_one_half_open_trial():
+    breaker = _half_open_breaker()
+
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_cancelled_trial_releases_the_host():
+    breaker = _half_open_breaker()
+    client = types.SimpleNamespace(breakers={HOST: breaker})
+
+    async def hanging_call() -> dict:
+        await asyncio.sleep(3600)
+        return {}
+
+    async def run():
+        trial = asyncio.ensure_future(
+            EcoflowApiClient._call_with_retry(client, HOST, hanging_call)
+        )
+        await asyncio.sleep(0)
+        assert not breaker.allow()
+
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(run())
+
+    assert breaker.state == BreakerState.HALF_OPEN
+    assert breaker.allow()
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.ecoflow_cloud.api.topic_router import (  # noqa: E402
+    EcoflowTopicRouter,
+)
+from custom_components.ecoflow_cloud.device_data import (  # noqa: E402
+    DeviceData,
+    DeviceOptions,
+)
+from custom_components.ecoflow_cloud.devices import (  # noqa: E402
+    DiagnosticDevice,
+    EcoflowDeviceInfo,
+)
+from custom_components.ecoflow_cloud.devices.data_holder import (  # noqa: E402
+    EcoflowDataHolder,
+)
+
+TOPIC = "/open/user/PARENT/quota"
+
+
+class CountingDevice(DiagnosticDevice):
+    def __init__(self, sn: str, parent: DeviceData | None = None):
+        options = DeviceOptions(60, -1, False)
+        super().__init__(
+            EcoflowDeviceInfo(
+                public_api=True,
+                sn=sn,
+                name=sn,
+                device_type="STUB",
+                status=1,
+                data_topic=TOPIC,
+                set_topic="/open/user/PARENT/set",
+                set_reply_topic="/open/user/PARENT/set_reply",
+                get_topic=None,
+                get_reply_topic=None,
+            ),
+            DeviceData(sn, sn, "STUB", options, None, parent),
+        )
+        self.data = EcoflowDataHolder(lambda message: message, self.module_sn())
+        self.decoded = 0
+
+    def _prepare_data(self, raw_data: bytes):
+        self.decoded += 1
+        return super()._prepare_data(raw_data)
+
+
+def test_shared_topic_is_decoded_once_and_filtered_by_module_sn():
+    parent = CountingDevice("PARENT")
+    first = CountingDevice("MOD1", parent.device_data)
+    second = CountingDevice("MOD2", parent.device_data)
+    router = EcoflowTopicRouter()
+    for device in (parent, first, second):
+        router.add_device(device)
+
+    payload = json.dumps({"moduleSn": "MOD2", "params": {"a": 1}}).encode()
+    assert router.route(TOPIC, payload)
+
+    # one class, one kind: a single decode for the whole group
+    assert parent.decoded + first.decoded + second.decoded == 1
+    assert parent.data.params == {"a": 1}
+    assert first.data.params == {}
+    assert second.data.params == {"a": 1}
+
+
+def test_removed_device_no_longer_receives_messages():
+    parent = CountingDevice("PARENT")
+    router = EcoflowTopicRouter()
+    router.add_device(parent)
+    router.remove_device(parent)
+
+    assert not router.route(TOPIC, b'{"params": {"a": 1}}')
+    assert router.topics() == []